@@ -1,3 +1,4 @@
+import asyncio
 import secrets
 import hashlib
 import base64
@@ -187,7 +188,9 @@ async def register(
         Access token and user information
     """
     try:
-        user = create_user_with_password(
+        # Password hashing is CPU-bound; keep it off the event loop
+        user = await asyncio.to_thread(
+            create_user_with_password,
             db=db,
             email=register_data.email,
             password=register_data.password,
@@ -224,7 +227,9 @@ async def login(
     Returns:
         Access token and user information
     """
-    user = authenticate_user(
+    # Password verification is CPU-bound; keep it off the event loop
+    user = await asyncio.to_thread(
+        authenticate_user,
         db=db,
         email=login_data.email,
         password=login_data.password
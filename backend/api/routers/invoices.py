@@ -12,6 +12,7 @@ from crud import item_assignments as crud_assignments
 from crud import table_participants as crud_participants
 from crud import wallets as crud_wallets
 from crud import order_items as crud_order_items
+from crud.table_sessions import bump_session_version
 from schemas.invoices import (
     InvoiceCreate,
     InvoiceUpdate,
@@ -61,24 +62,53 @@ def list_invoices(
     user_id: Optional[uuid.UUID] = Query(None, description="Filter by user (creditor or debtor)"),
     status: Optional[str] = Query(None, description="Filter by status"),
     group_id: Optional[uuid.UUID] = Query(None, description="Filter by group"),
+    limit: int = Query(crud_invoices.PAGE_SIZE, ge=1, le=crud_invoices.MAX_PAGE_SIZE, description="Number of invoices per page"),
+    cursor: Optional[uuid.UUID] = Query(None, description="Last invoice id of the previous page"),
     db: SessionDep = None
 ):
     """List invoices with optional filters."""
-    invoices = crud_invoices.list_invoices(db, user_id=user_id, status=status, group_id=group_id)
+    try:
+        invoices = crud_invoices.list_invoices(
+            db, user_id=user_id, status=status, group_id=group_id, limit=limit, cursor=cursor,
+            columns=crud_invoices.RESPONSE_COLUMNS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return invoices
 
 
 @router.get("/users/{user_id}/invoices", response_model=list[InvoiceResponse])
-def get_user_invoices(user_id: uuid.UUID, db: SessionDep):
-    """Get all invoices for a user (as creditor or debtor)."""
-    invoices = crud_invoices.get_user_invoices(db, user_id)
+def get_user_invoices(
+    user_id: uuid.UUID,
+    status: Optional[str] = Query(None, description="Filter by status"),
+    limit: int = Query(crud_invoices.PAGE_SIZE, ge=1, le=crud_invoices.MAX_PAGE_SIZE, description="Number of invoices per page"),
+    cursor: Optional[uuid.UUID] = Query(None, description="Last invoice id of the previous page"),
+    db: SessionDep = None
+):
+    """Get all invoices for a user (as creditor or debtor), optionally filtered by status."""
+    try:
+        invoices = crud_invoices.get_user_invoices(
+            db, user_id, status=status, limit=limit, cursor=cursor, columns=crud_invoices.RESPONSE_COLUMNS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return invoices
 
 
 @router.get("/users/{user_id}/invoices/pending", response_model=list[InvoiceResponse])
-def get_user_pending_invoices(user_id: uuid.UUID, db: SessionDep):
+def get_user_pending_invoices(
+    user_id: uuid.UUID,
+    limit: int = Query(crud_invoices.PAGE_SIZE, ge=1, le=crud_invoices.MAX_PAGE_SIZE, description="Number of invoices per page"),
+    cursor: Optional[uuid.UUID] = Query(None, description="Last invoice id of the previous page"),
+    db: SessionDep = None
+):
     """Get pending invoices for a user."""
-    invoices = crud_invoices.get_user_pending_invoices(db, user_id)
+    try:
+        invoices = crud_invoices.get_user_pending_invoices(
+            db, user_id, limit=limit, cursor=cursor, columns=crud_invoices.RESPONSE_COLUMNS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return invoices
 
 
@@ -235,18 +265,19 @@ async def _finalize_session_if_all_paid(
         session.status = "closed"
         session.session_end = datetime.now()
         db.add(session)
-        db.commit()
+        version = bump_session_version(db, session_id)
         
         from api.websocket.manager import manager
         from schemas.websocket import SessionFinalizedMessage
         
-        broadcast_msg = SessionFinalizedMessage(
+        broadcast_msg = SessionFinalizedMessage.model_construct(
             session_id=session_id,
             total_amount=total_order_items_amount,
-            ready_for_invoices=True
+            ready_for_invoices=True,
+            version=version
         )
-        await manager.broadcast_to_session(
-            broadcast_msg.model_dump(mode='json'),
+        await manager.broadcast_model(
+            broadcast_msg,
             session_id
         )
     except Exception as e:
@@ -55,7 +55,7 @@ def get_wallet_transactions(
 ):
     """Get transactions for a wallet."""
     transactions = crud_wallets.get_wallet_transactions(
-        db, wallet_id=wallet_id, limit=limit
+        db, wallet_id=wallet_id, limit=limit, columns=crud_wallets.TRANSACTION_RESPONSE_COLUMNS
     )
     return transactions
 
@@ -68,7 +68,7 @@ def get_user_transactions(
 ):
     """Get transactions for a user's wallet."""
     transactions = crud_wallets.get_wallet_transactions(
-        db, user_id=user_id, limit=limit
+        db, user_id=user_id, limit=limit, columns=crud_wallets.TRANSACTION_RESPONSE_COLUMNS
     )
     return transactions
 
@@ -84,7 +84,6 @@ async def top_up_wallet(
     # Log incoming request details
     logging.info(f"[Wallet Top-Up] Request received for user: {current_user.id}")
     logging.info(f"[Wallet Top-Up] Request body: {top_up_data.model_dump()}")
-    logging.info(f"[Wallet Top-Up] Request headers: {dict(request.headers)}")
     
     # Get or create wallet
     wallet = crud_wallets.get_or_create_wallet(db, current_user.id)
@@ -133,24 +132,31 @@ async def top_up_wallet(
             # In integration mode, Transbank returns a token immediately
             transbank_token = transbank_data.get("token")
             logging.info(f"[Wallet Top-Up] Transbank token: {transbank_token}")
+            if not transbank_token:
+                # Don't touch the wallet unless Transbank actually created the transaction
+                logging.error(f"[Wallet Top-Up] Transbank returned no token (status: {response.status_code})")
+                raise HTTPException(status_code=502, detail="Transbank returned no token")
             
             # For integration, we'll simulate successful payment and add to wallet
             # In production, you'd verify the payment status first
-            transaction = crud_wallets.create_wallet_transaction(
+            # The wallet is already loaded, so skip create_wallet_transaction's existence lookup
+            transaction = crud_wallets.add_wallet_transaction(
                 db=db,
-                wallet_id=wallet.id,
+                wallet=wallet,
                 transaction_type="deposit",
                 amount=top_up_data.amount,
                 currency=top_up_data.currency,
                 description=f"Wallet top-up via Transbank"
             )
+            transaction_id = transaction.id
+            db.commit()
             
             # Refresh wallet to get updated balance
             db.refresh(wallet)
-            logging.info(f"[Wallet Top-Up] Transaction created: {transaction.id}, New balance: {wallet.balance}")
+            logging.info(f"[Wallet Top-Up] Transaction created: {transaction_id}, New balance: {wallet.balance}")
             
             response_data = WalletTopUpResponse(
-                transaction_id=transaction.id,
+                transaction_id=transaction_id,
                 wallet_id=wallet.id,
                 amount=top_up_data.amount,
                 balance=wallet.balance,
@@ -159,6 +165,8 @@ async def top_up_wallet(
             logging.info(f"[Wallet Top-Up] Success! Returning response: {response_data.model_dump()}")
             return response_data
             
+    except HTTPException:
+        raise
     except httpx.HTTPError as e:
         logging.error(f"[Wallet Top-Up] HTTPError from Transbank: {str(e)}")
         logging.error(f"[Wallet Top-Up] Response: {e.response.text if hasattr(e, 'response') else 'No response'}")
@@ -1,76 +1,246 @@
+import asyncio
+import logging
+import orjson
 from typing import Dict, Set
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+from websockets.exceptions import ConnectionClosed
 import uuid
 
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis channel prefix; each session publishes on f"{CHANNEL_PREFIX}{session_id}"
+CHANNEL_PREFIX = "ws:"
+
+# Sockets sent to concurrently before yielding back to the event loop
+BROADCAST_BATCH_SIZE = settings.WS_BROADCAST_BATCH_SIZE
+
+# Backoff between attempts to resubscribe after the Redis subscription drops
+LISTENER_RETRY_DELAY = 0.5  # seconds
+LISTENER_MAX_RETRY_DELAY = 30.0  # seconds
+
+
+def encode_message(message: dict) -> str:
+    """Serialize a message once with orjson (handles UUIDs and datetimes natively)."""
+    # Decoded to str so it still goes out as a text frame, which the app's JSON.parse expects
+    return orjson.dumps(message).decode()
+
 
 class ConnectionManager:
     """Manages WebSocket connections for table sessions."""
     
     def __init__(self):
-        # session_id -> Set[WebSocket]
-        self.active_connections: Dict[uuid.UUID, Set[WebSocket]] = {}
-        # WebSocket -> session_id
-        self.websocket_to_session: Dict[WebSocket, uuid.UUID] = {}
+        # session_id.int -> Set[WebSocket]; int keys hash cheaper than UUIDs
+        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    
+    async def start(self):
+        """Start background resources. The in-process manager needs none."""
+    
+    async def stop(self):
+        """Release background resources. The in-process manager needs none."""
     
     async def connect(self, websocket: WebSocket, session_id: uuid.UUID):
         """Connect a WebSocket to a session."""
         await websocket.accept()
         
-        if session_id not in self.active_connections:
-            self.active_connections[session_id] = set()
-        
-        self.active_connections[session_id].add(websocket)
-        self.websocket_to_session[websocket] = session_id
+        self.active_connections.setdefault(session_id.int, set()).add(websocket)
+        # The socket remembers its own session instead of a reverse index
+        websocket.state.session_id = session_id
     
     def disconnect(self, websocket: WebSocket):
         """Disconnect a WebSocket from a session."""
-        if websocket in self.websocket_to_session:
-            session_id = self.websocket_to_session[websocket]
-            if session_id in self.active_connections:
-                self.active_connections[session_id].discard(websocket)
-                if not self.active_connections[session_id]:
-                    del self.active_connections[session_id]
-            del self.websocket_to_session[websocket]
+        session_id = getattr(websocket.state, "session_id", None)
+        if session_id is None:
+            return
+        connections = self.active_connections.get(session_id.int)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.active_connections[session_id.int]
+        websocket.state.session_id = None
+    
+    def connection_count(self, session_id: uuid.UUID) -> int:
+        """Number of local connections in a session."""
+        return len(self.active_connections.get(session_id.int, ()))
     
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send a message to a specific WebSocket."""
-        await websocket.send_json(message)
+        await websocket.send_text(encode_message(message))
+    
+    async def send_error(self, websocket: WebSocket, message: str):
+        """Send an error message to a specific WebSocket."""
+        await websocket.send_text(encode_message({"type": "error", "message": message}))
+    
+    async def send_model(self, message: BaseModel, websocket: WebSocket):
+        """Send a message model to a specific WebSocket, serialized straight to JSON."""
+        await websocket.send_text(message.model_dump_json())
+    
+    async def broadcast_model(self, message: BaseModel, session_id: uuid.UUID, exclude: WebSocket = None):
+        """Broadcast a message model to all connections in a session, serialized straight to JSON."""
+        await self.broadcast_prepared(message.model_dump_json(), session_id, exclude=exclude)
     
     async def broadcast_to_session(self, message: dict, session_id: uuid.UUID, exclude: WebSocket = None):
         """Broadcast a message to all connections in a session."""
-        if session_id not in self.active_connections:
-            print(f"[ConnectionManager] No active connections for session {session_id}")
+        await self.broadcast_prepared(encode_message(message), session_id, exclude=exclude)
+    
+    async def broadcast_prepared(self, payload: str, session_id: uuid.UUID, exclude: WebSocket = None):
+        """Broadcast an already-serialized message to all connections in a session."""
+        session_connections = self.active_connections.get(session_id.int)
+        if session_connections is None:
+            logger.debug("[ConnectionManager] No active connections for session %s", session_id)
             return
         
-        connections = list(self.active_connections[session_id])
-        print(f"[ConnectionManager] Broadcasting to {len(connections)} connections (excluding {1 if exclude else 0})")
+        # Use 'is' for identity comparison to ensure we're comparing the same object
+        connections = [connection for connection in session_connections if connection is not exclude]
+        logger.debug("[ConnectionManager] Broadcasting to %d connections (excluding %d)", len(connections), 1 if exclude else 0)
         
         if len(connections) == 0:
-            print(f"[ConnectionManager] No connections to broadcast to")
+            logger.debug("[ConnectionManager] No connections to broadcast to")
             return
         
+        results = []
+        for i in range(0, len(connections), BROADCAST_BATCH_SIZE):
+            if i:
+                # Let other sessions' receives run between batches on large tables
+                await asyncio.sleep(0)
+            results += await asyncio.gather(
+                *(connection.send_text(payload) for connection in connections[i:i + BROADCAST_BATCH_SIZE]),
+                return_exceptions=True
+            )
+        
         disconnected = set()
-        sent_count = 0
-        for connection in connections:
-            # Use 'is' for identity comparison to ensure we're comparing the same object
-            if connection is exclude:
-                print(f"[ConnectionManager] Skipping excluded connection")
-                continue
-            try:
-                print(f"[ConnectionManager] Sending message type '{message.get('type', 'unknown')}' to connection")
-                await connection.send_json(message)
-                sent_count += 1
-                print(f"[ConnectionManager] Message sent successfully ({sent_count}/{len(connections) - (1 if exclude else 0)})")
-            except Exception as e:
-                print(f"[ConnectionManager] Error sending message: {e}")
+        error = None
+        for connection, result in zip(connections, results):
+            if isinstance(result, (WebSocketDisconnect, ConnectionClosed, OSError)):
                 disconnected.add(connection)
+            elif isinstance(result, BaseException) and error is None:
+                # Only transport failures mean the peer is gone; anything else propagates after cleanup
+                error = result
         
-        print(f"[ConnectionManager] Broadcast completed: {sent_count} messages sent, {len(disconnected)} failed")
+        logger.debug(
+            "[ConnectionManager] Broadcast completed: %d messages sent, %d failed",
+            len(connections) - len(disconnected), len(disconnected)
+        )
         
         # Clean up disconnected connections
         for conn in disconnected:
             self.disconnect(conn)
+        
+        if error is not None:
+            raise error
+
+
+class RedisConnectionManager(ConnectionManager):
+    """Fans broadcasts out to every worker through Redis pub/sub.
+    
+    Each worker keeps its own local sockets; broadcasts are published to Redis and
+    every worker (including the publisher) forwards them to its local connections.
+    """
+    
+    def __init__(self, redis_url: str):
+        super().__init__()
+        self.redis_url = redis_url
+        # Identifies this worker so `exclude` is only applied where the socket lives
+        self.worker_id = uuid.uuid4().hex
+        self._redis = None
+        self._listener: asyncio.Task | None = None
+    
+    async def start(self):
+        """Open the Redis connection and start forwarding published broadcasts."""
+        import redis.asyncio as redis
+        
+        self._redis = redis.from_url(self.redis_url, decode_responses=False)
+        pubsub = self._redis.pubsub()
+        await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+        self._listener = asyncio.create_task(self._listen(pubsub))
+    
+    async def stop(self):
+        """Stop the listener and close the Redis connection."""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
+    
+    async def _listen(self, pubsub):
+        """
+        Forward every published broadcast to this worker's local connections.
+        Runs until cancelled: a failed event is logged and skipped, and a lost subscription is reopened with backoff.
+        """
+        delay = LISTENER_RETRY_DELAY
+        try:
+            while True:
+                try:
+                    if pubsub is None:
+                        pubsub = self._redis.pubsub()
+                        await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                        logger.info("[RedisConnectionManager] Resubscribed to broadcasts")
+                        delay = LISTENER_RETRY_DELAY
+                    async for event in pubsub.listen():
+                        if event["type"] != "pmessage":
+                            continue
+                        try:
+                            await self._forward(event)
+                        except Exception:
+                            # One bad event or send must not stop this worker's fan-out
+                            logger.exception("[RedisConnectionManager] Failed to forward broadcast")
+                except Exception as e:
+                    logger.warning("[RedisConnectionManager] Lost Redis subscription (%s); retrying in %.1fs", e, delay)
+                
+                await self._close_pubsub(pubsub)
+                pubsub = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LISTENER_MAX_RETRY_DELAY)
+        finally:
+            await self._close_pubsub(pubsub)
+    
+    async def _forward(self, event: dict):
+        """Broadcast one published event to this worker's connections in its session."""
+        try:
+            channel = event["channel"].decode()
+            session_id = uuid.UUID(channel[len(CHANNEL_PREFIX):])
+            worker_id, exclude_id, payload = event["data"].split(b"|", 2)
+        except ValueError as e:
+            logger.warning("[RedisConnectionManager] Ignoring malformed event: %s", e)
+            return
+        
+        exclude = None
+        if worker_id.decode() == self.worker_id and exclude_id:
+            exclude = next(
+                (ws for ws in self.active_connections.get(session_id.int, ()) if id(ws) == int(exclude_id)),
+                None
+            )
+        await super().broadcast_prepared(payload.decode(), session_id, exclude=exclude)
+    
+    @staticmethod
+    async def _close_pubsub(pubsub):
+        """Close a pubsub, ignoring errors from a connection that is already broken."""
+        if pubsub is None:
+            return
+        try:
+            await pubsub.aclose()
+        except Exception:
+            logger.debug("[RedisConnectionManager] Error closing pubsub", exc_info=True)
+    
+    async def broadcast_prepared(self, payload: str, session_id: uuid.UUID, exclude: WebSocket = None):
+        """Publish a message so every worker broadcasts it to its connections in the session."""
+        if self._redis is None:
+            # Not started (e.g. no lifespan); fall back to this worker's connections
+            await super().broadcast_prepared(payload, session_id, exclude=exclude)
+            return
+        
+        # "worker_id|exclude_id|payload": the already-encoded payload is appended as-is, not re-escaped into JSON
+        exclude_id = str(id(exclude)) if exclude is not None else ""
+        envelope = f"{self.worker_id}|{exclude_id}|".encode() + payload.encode()
+        await self._redis.publish(f"{CHANNEL_PREFIX}{session_id}", envelope)
 
 
-manager = ConnectionManager()
+manager = RedisConnectionManager(settings.REDIS_URL) if settings.REDIS_URL else ConnectionManager()
 
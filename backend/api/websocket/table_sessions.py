@@ -1,28 +1,41 @@
+import asyncio
+import logging
+import orjson
 import uuid
+import weakref
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 from models.table_participants import TableParticipant
 from models.order_items import OrderItem
+from models.item_assignments import ItemAssignment
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from api.websocket.manager import manager
+from db.session import SessionLocal
 from models.table_sessions import TableSession
 from crud.table_participants import (
-    get_participants_by_session_id,
-    get_participant_by_session_and_user,
-    get_participant_by_id,
-    create_participant
+    get_participant_id_by_session_and_user,
+    get_participants_by_ids,
+    get_participant_rows_with_users,
+    get_selectable_user_ids,
+    insert_participant
 )
+from crud.table_sessions import bump_session_version, get_equal_split_stats, get_session_version, is_session_locked
 from crud.order_items import (
-    get_order_items_by_session_id,
-    get_order_item_by_id
+    get_order_item_by_id,
+    get_order_item_rows_with_assignments
 )
 from crud.item_assignments import (
     get_assignments_by_order_item_id,
-    get_assignments_by_session_id,
+    get_assigned_total_by_session_id,
     get_assignment_by_id,
+    get_assignment_with_session_id,
+    get_assignment_target_session_ids,
+    get_summary_by_session_id,
+    get_validation_stats,
     create_assignment,
-    update_assignment,
+    bulk_update_assignments_for_item,
     delete_assignment
 )
 from schemas.websocket import (
@@ -33,14 +46,13 @@ from schemas.websocket import (
     RemoveAssignmentMessage,
     ParticipantJoinedMessage,
     ParticipantLeftMessage,
-    ItemAssignedMessage,
-    AssignmentUpdatedMessage,
-    AssignmentRemovedMessage,
+    AssignmentsChangedMessage,
     EqualSplitCalculatedMessage,
     SummaryUpdatedMessage,
     AssignmentsValidatedMessage,
     SessionFinalizedMessage,
     SessionStateMessage,
+    SessionSyncedMessage,
     SelectableParticipantsMessage,
     PayingForParticipantsMessage,
     UnlockSessionMessage,
@@ -48,17 +60,95 @@ from schemas.websocket import (
     SessionUnlockedMessage,
 )
 
-# Track websocket -> participant_id mapping
-_websocket_participants: dict[WebSocket, uuid.UUID] = {}
+logger = logging.getLogger(__name__)
+
+# Rapid assign/remove events in a session are written in one transaction and one broadcast
+ASSIGNMENT_BATCH_WINDOW = 0.02  # seconds
+ASSIGNMENT_BATCH_MAX_SIZE = 100
+
+# session_id -> queue of pending (websocket, assign/remove message) writes
+_pending_assignment_changes: dict[uuid.UUID, asyncio.Queue] = {}
+# Running flush tasks, referenced so they aren't garbage collected mid-batch
+_assignment_flush_tasks: set[asyncio.Task] = set()
+
+# session_id -> (version, {key: value}) for read-only results; reused only while the session's version is unchanged
+# Sound because every change to what these results show bumps the version (bump_session_version, or
+# bump_user_session_versions for participants' names and avatars), and a version number never comes back
+_session_cache: dict[uuid.UUID, tuple[int, dict]] = {}
+
+
+def _get_cached(session_id: uuid.UUID, version: int | None, key: str):
+    """Get a cached read result for the session, if it was computed at this version."""
+    entry = _session_cache.get(session_id)
+    if not entry:
+        return None
+    if entry[0] != version:
+        # Computed at another version; it can never match again, so drop it
+        if version is None or entry[0] < version:
+            del _session_cache[session_id]
+        return None
+    return entry[1].get(key)
+
+
+def _set_cached(session_id: uuid.UUID, version: int, key: str, value):
+    """Cache a read result computed at the given session version."""
+    entry = _session_cache.get(session_id)
+    if entry and entry[0] > version:
+        # A newer version is already cached; don't replace it with older data
+        return
+    if not entry or entry[0] != version:
+        entry = _session_cache[session_id] = (version, {})
+    entry[1][key] = value
+
+
+async def _run(fn, *args, **kwargs):
+    """
+    Run a blocking database call in a worker thread so it doesn't stall the event loop.
+    Calls are awaited one at a time, so the connection's Session is never used concurrently.
+    """
+    call = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        # The thread can't be interrupted; let it finish before the Session is closed under it
+        await asyncio.wait([call])
+        raise
+
+
+def _track_participant(websocket: WebSocket, session_id: uuid.UUID, participant_id: uuid.UUID, user_id: uuid.UUID | None):
+    """
+    Track the participant behind a websocket on the socket itself, so it lives exactly as long as the connection.
+    If the socket is garbage collected without going through cleanup, the leave is still broadcast.
+    """
+    websocket.state.participant_id = participant_id
+    websocket.state.user_id = user_id
+    previous = getattr(websocket.state, "participant_finalizer", None)
+    if previous:
+        previous.detach()
+    websocket.state.participant_finalizer = weakref.finalize(
+        websocket, _announce_participant_left, asyncio.get_running_loop(), session_id, participant_id
+    )
+
+
+def _announce_participant_left(loop: asyncio.AbstractEventLoop, session_id: uuid.UUID, participant_id: uuid.UUID):
+    """Schedule a participant_left broadcast from a finalizer, which may run outside the event loop."""
+    if loop.is_closed():
+        return
+    broadcast_msg = ParticipantLeftMessage.model_construct(participant_id=participant_id)
+    loop.call_soon_threadsafe(loop.create_task, manager.broadcast_model(broadcast_msg, session_id))
 
 
 async def _cleanup_participant(websocket: WebSocket, session_id: uuid.UUID):
     """Clean up participant tracking and broadcast leave message."""
-    participant_id = _websocket_participants.pop(websocket, None)
+    finalizer = getattr(websocket.state, "participant_finalizer", None)
+    if finalizer:
+        finalizer.detach()
+    participant_id = getattr(websocket.state, "participant_id", None)
+    websocket.state.participant_id = None
     if participant_id:
-            broadcast_msg = ParticipantLeftMessage(participant_id=participant_id)
-            await manager.broadcast_to_session(
-                broadcast_msg.model_dump(mode='json'),
+            broadcast_msg = ParticipantLeftMessage.model_construct(participant_id=participant_id)
+            await manager.broadcast_model(
+                broadcast_msg,
                 session_id,
                 exclude=websocket
             )
@@ -67,30 +157,14 @@ async def _cleanup_participant(websocket: WebSocket, session_id: uuid.UUID):
 async def _handle_message(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Route incoming message to appropriate handler."""
     message_type = data.get("type")
-    print(f"[WebSocket] Received message type: {message_type}, data: {data}")
+    logger.debug("[WebSocket] Received message type: %s, data: %s", message_type, data)
     
-    handlers = {
-        "join_session": lambda: handle_join_session(websocket, session_id, data, db),
-        "get_selectable_participants": lambda: handle_get_selectable_participants(websocket, session_id, data, db),
-        "get_paying_for_participants": lambda: handle_get_paying_for_participants(websocket, session_id, data, db),
-        "assign_item": lambda: handle_assign_item(websocket, session_id, data, db),
-        "remove_assignment": lambda: handle_remove_assignment(websocket, session_id, data, db),
-        "calculate_equal_split": lambda: handle_calculate_equal_split(websocket, session_id, db),
-        "request_summary": lambda: handle_request_summary(websocket, session_id, db),
-        "validate_assignments": lambda: handle_validate_assignments(websocket, session_id, db),
-        "unlock_session": lambda: handle_unlock_session(websocket, session_id, db),
-        "finalize_session": lambda: handle_finalize_session(websocket, session_id, db),
-    }
-    
-    handler = handlers.get(message_type)
+    handler = _HANDLERS.get(message_type)
     if handler:
-        await handler()
+        await handler(websocket, session_id, data, db)
     else:
-        print(f"[WebSocket] Unknown message type: {message_type}")
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Unknown message type: {message_type}"
-        })
+        logger.debug("[WebSocket] Unknown message type: %s", message_type)
+        await manager.send_error(websocket, f"Unknown message type: {message_type}")
 
 
 async def websocket_session_endpoint(websocket: WebSocket, session_id: uuid.UUID, db: Session):
@@ -98,87 +172,148 @@ async def websocket_session_endpoint(websocket: WebSocket, session_id: uuid.UUID
     await manager.connect(websocket, session_id)
     
     # Verify session exists
-    session = db.get(TableSession, session_id)
+    session = await _get_table_session(websocket, session_id, db)
     if not session:
+        manager.disconnect(websocket)
         await websocket.close(code=1008, reason="Session not found")
         return
     
     try:
-        # Send initial session state
-        await send_session_state(websocket, session_id, db)
+        # Send initial session state, unless the client says it already has the current version
+        await _send_state_or_synced(websocket, session_id, db, _parse_last_version(websocket))
         
         while True:
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
             await _handle_message(websocket, session_id, data, db)
     
     except WebSocketDisconnect:
-        await _cleanup_participant(websocket, session_id)
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": str(e)
-        })
-        await _cleanup_participant(websocket, session_id)
+        await manager.send_error(websocket, str(e))
+    finally:
+        # Runs even if the error can't be sent or the task is cancelled, so nothing stays registered
         manager.disconnect(websocket)
+        if not manager.connection_count(session_id):
+            _session_cache.pop(session_id, None)
+        await _cleanup_participant(websocket, session_id)
+
+
+async def _get_table_session(websocket: WebSocket, session_id: uuid.UUID, db: Session) -> TableSession | None:
+    """
+    Get the connection's TableSession, cached on the websocket after the first lookup.
+    The instance belongs to the connection's db session, so it still reloads after commits.
+    """
+    session = getattr(websocket.state, "table_session", None)
+    if session is None:
+        session = await _run(db.get, TableSession, session_id)
+        websocket.state.table_session = session
+    return session
 
 
 async def send_session_state(websocket: WebSocket, session_id: uuid.UUID, db: Session):
     """Send complete session state to a client."""
-    from models.users import User
-    
-    session = db.get(TableSession, session_id)
+    session = await _get_table_session(websocket, session_id, db)
     if not session:
         return
     
-    participants = get_participants_by_session_id(db, session_id)
+    # Every write bumps the version, so the serialized state can be shared until then
+    version = await _run(get_session_version, db, session_id)
+    payload = _get_cached(session_id, version, "session_state")
+    if payload is None:
+        # Reload the cached row so the state and its version match the database
+        await _run(db.refresh, session)
+        payload = await _run(_build_session_state_payload, db, session)
+        _set_cached(session_id, session.version, "session_state", payload)
+    await websocket.send_text(payload)
+
+
+def _parse_last_version(websocket: WebSocket) -> int | None:
+    """Read the optional last_version query parameter a reconnecting client sends."""
+    try:
+        return int(websocket.query_params["last_version"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def _send_state_or_synced(websocket: WebSocket, session_id: uuid.UUID, db: Session, last_version: int | None):
+    """Send the full session state, or just session_synced if the client already has the current version."""
+    if last_version is None:
+        await send_session_state(websocket, session_id, db)
+        return
+    
+    session = await _get_table_session(websocket, session_id, db)
+    if not session:
+        return
+    await _run(db.refresh, session)
+    if last_version == session.version:
+        # Nothing changed since the client's last state; only confirm the lock status
+        await manager.send_model(
+            SessionSyncedMessage.model_construct(
+                version=session.version,
+                locked=session.locked,
+                locked_by_user_id=session.locked_by_user_id
+            ),
+            websocket
+        )
+    else:
+        await send_session_state(websocket, session_id, db)
+
+
+def _build_session_state_payload(db: Session, session: TableSession) -> str:
+    """Build the serialized session state message from two joined queries."""
+    session_id = session.id
     
-    # Load user information for participants
+    # UUIDs are left as-is; the JSON serializer formats them natively instead of a str() per field
+    # Participants with their user information, read as plain rows instead of ORM objects
     participant_data = []
-    for p in participants:
+    for p in get_participant_rows_with_users(db, session_id):
         participant_dict = {
-            "id": str(p.id),
-            "user_id": str(p.user_id) if p.user_id else None,
-            "joined_at": p.joined_at.isoformat()
+            "id": p["id"],
+            "user_id": p["user_id"],
+            "joined_at": p["joined_at"].isoformat()
         }
-        # If participant has a user_id, load user information
-        if p.user_id:
-            user = db.get(User, p.user_id)
-            if user:
-                participant_dict["user_name"] = user.name
-                participant_dict["user_avatar_url"] = user.avatar_url
+        # If participant has a user, attach user information
+        if p["user_name"] is not None:
+            participant_dict["user_name"] = p["user_name"]
+            participant_dict["user_avatar_url"] = p["user_avatar_url"]
         participant_data.append(participant_dict)
     
-    order_items = get_order_items_by_session_id(db, session_id)
-    
-    assignments = get_assignments_by_session_id(db, session_id)
+    # Order items and their assignments come back as one row per (item, assignment)
+    order_items = {}
+    assignments = []
+    for row in get_order_item_rows_with_assignments(db, session_id):
+        if row["id"] not in order_items:
+            order_items[row["id"]] = {
+                "id": row["id"],
+                "item_name": row["item_name"],
+                "unit_price": row["unit_price"],
+                "ordered_at": row["ordered_at"].isoformat()
+            }
+        if row["assignment_id"] is not None:
+            assignments.append({
+                "id": row["assignment_id"],
+                "order_item_id": row["id"],
+                "creditor_id": row["creditor_id"],
+                "debtor_id": row["debtor_id"],
+                "assigned_amount": row["assigned_amount"]
+            })
     
-    message = SessionStateMessage(
+    message = SessionStateMessage.model_construct(
         session={
-            "id": str(session.id),
+            "id": session.id,
             "status": session.status,
             "total_amount": session.total_amount,
             "currency": session.currency,
             "locked": session.locked,
-            "locked_by_user_id": str(session.locked_by_user_id) if session.locked_by_user_id else None
+            "locked_by_user_id": session.locked_by_user_id,
+            "version": session.version
         },
         participants=participant_data,
-        order_items=[{
-            "id": str(item.id),
-            "item_name": item.item_name,
-            "unit_price": item.unit_price,
-            "ordered_at": item.ordered_at.isoformat()
-        } for item in order_items],
-        assignments=[{
-            "id": str(a.id),
-            "order_item_id": str(a.order_item_id),
-            "creditor_id": str(a.creditor_id),
-            "debtor_id": str(a.debtor_id) if a.debtor_id else None,
-            "assigned_amount": a.assigned_amount
-        } for a in assignments]
+        order_items=list(order_items.values()),
+        assignments=assignments
     )
     
-    await websocket.send_json(message.model_dump(mode='json'))
+    return message.model_dump_json()
 
 
 async def handle_join_session(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
@@ -187,15 +322,26 @@ async def handle_join_session(websocket: WebSocket, session_id: uuid.UUID, data:
         msg = JoinSessionMessage(**data)
         
         # Check if participant already exists
-        existing = get_participant_by_session_and_user(db, session_id, msg.user_id)
-        
-        if not existing:
+        existing_id = await _run(get_participant_id_by_session_and_user, db, session_id, msg.user_id)
+        
+        participant = None
+        if not existing_id:
+            try:
+                participant, version = await _run(_insert_joined_participant, db, session_id, msg.user_id)
+            except IntegrityError:
+                # Another connection of the same user joined in between; join as that participant
+                await _run(db.rollback)
+                existing_id = await _run(get_participant_id_by_session_and_user, db, session_id, msg.user_id)
+                if not existing_id:
+                    raise
+        
+        if participant:
             from models.users import User
             
-            participant = create_participant(db, session_id, msg.user_id)
+            participant_id, participant_user_id = participant["id"], participant["user_id"]
             
             # Track this websocket -> participant mapping
-            _websocket_participants[websocket] = participant.id
+            _track_participant(websocket, session_id, participant_id, participant_user_id)
             
             # Send updated session state to the joining client
             await send_session_state(websocket, session_id, db)
@@ -203,54 +349,58 @@ async def handle_join_session(websocket: WebSocket, session_id: uuid.UUID, data:
             # Load user information for broadcast message
             user_name = None
             user_avatar_url = None
-            if participant.user_id:
-                user = db.get(User, participant.user_id)
+            if participant_user_id:
+                user = await _run(db.get, User, participant_user_id)
                 if user:
                     user_name = user.name
                     user_avatar_url = user.avatar_url
             
             # Broadcast to others
-            broadcast_msg = ParticipantJoinedMessage(
-                participant_id=participant.id,
-                user_id=participant.user_id,
-                joined_at=participant.joined_at.isoformat(),
+            broadcast_msg = ParticipantJoinedMessage.model_construct(
+                participant_id=participant_id,
+                user_id=participant_user_id,
+                joined_at=participant["joined_at"].isoformat(),
                 user_name=user_name,
-                user_avatar_url=user_avatar_url
+                user_avatar_url=user_avatar_url,
+                version=version
             )
-            broadcast_data = broadcast_msg.model_dump(mode='json')
-            print(f"[WebSocket] Broadcasting participant_joined: {broadcast_data}")
-            print(f"[WebSocket] Active connections for session {session_id}: {len(manager.active_connections.get(session_id, set()))}")
-            await manager.broadcast_to_session(
-                broadcast_data,
+            logger.debug("[WebSocket] Broadcasting participant_joined: %s", broadcast_msg)
+            logger.debug("[WebSocket] Active connections for session %s: %s", session_id, manager.connection_count(session_id))
+            await manager.broadcast_model(
+                broadcast_msg,
                 session_id,
                 exclude=websocket
             )
-            print(f"[WebSocket] participant_joined broadcast completed")
+            logger.debug("[WebSocket] participant_joined broadcast completed")
         else:
             # Track existing participant for this websocket
-            _websocket_participants[websocket] = existing.id
-            # Send updated session state to the client
-            await send_session_state(websocket, session_id, db)
+            _track_participant(websocket, session_id, existing_id, msg.user_id)
+            await _send_state_or_synced(websocket, session_id, db, msg.last_version)
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to join session: {str(e)}"
-        })
+        await _run(db.rollback)
+        await manager.send_error(websocket, f"Failed to join session: {str(e)}")
+
+
+def _insert_joined_participant(db: Session, session_id: uuid.UUID, user_id: uuid.UUID | None) -> tuple[dict, int]:
+    """Insert the participant and bump the session version in one commit. Returns the participant and the new version."""
+    participant = insert_participant(db, session_id, user_id, commit=False)
+    version = bump_session_version(db, session_id)
+    return participant, version
+
 
-def _validate_order_item_belongs_to_session(order_item: OrderItem, session_id: uuid.UUID) -> tuple[bool, str | None]:
+def _validate_order_item_belongs_to_session(item_session_id: uuid.UUID | None, session_id: uuid.UUID) -> tuple[bool, str | None]:
     """
-    Validate that an assignment exists and belongs to the session.
+    Validate that an order item exists and belongs to the session, given the item's session_id (None if missing).
     Returns (is_valid, error_message).
     """
-    if not order_item or order_item.session_id != session_id:
+    if item_session_id != session_id:
         return False, "Order item not found or doesn't belong to this session"
     return True, None
 
 
-def _get_new_amount_per_assignment(order_item: OrderItem, db: Session, negative_adjustment: bool = False) -> int:
-    """Get the new assignment amount for an order item."""
+def _get_new_amount_per_assignment(order_item: OrderItem, assignments: list[ItemAssignment], negative_adjustment: bool = False) -> int:
+    """Get the new assignment amount for an order item, given its current assignments."""
     total_amount = order_item.unit_price
-    assignments = get_assignments_by_order_item_id(db, order_item.id)
     current_number_of_assignments = len(assignments)
     new_number_of_assignments = current_number_of_assignments + (-1 if negative_adjustment else 1)
     if new_number_of_assignments == 0:
@@ -267,37 +417,22 @@ async def handle_get_selectable_participants(websocket: WebSocket, session_id: u
     The user that asks for the selectable participants cannot be selected as a debtor.
     """
     msg = GetSelectableParticipantsMessage(**data)
-    participants = get_participants_by_session_id(db, session_id)
-    assignments = get_assignments_by_order_item_id(db, msg.order_item_id)
     
     # Get the current user's participant_id to exclude them
-    current_user_participant = get_participant_by_session_and_user(db, session_id, msg.user_id)
-    current_user_participant_id = current_user_participant.id if current_user_participant else None
+    current_user_participant_id = await _run(get_participant_id_by_session_and_user, db, session_id, msg.user_id)
     
-    # Exclude participant_ids that are already creditors or debtors
-    excluded_participant_ids = {
-        assignment.creditor_id for assignment in assignments
-    } | {
-        assignment.debtor_id for assignment in assignments if assignment.debtor_id
-    }
-    
-    # Also exclude the current user's participant_id
-    if current_user_participant_id:
-        excluded_participant_ids.add(current_user_participant_id)
-    
-    # Filter participants and return their user_ids as strings
+    # Participants that are not yet creditors or debtors of the item, as user_id strings
     selectable_participants = [
-        str(participant.user_id) 
-        for participant in participants 
-        if participant.id not in excluded_participant_ids and participant.user_id is not None
+        str(user_id)
+        for user_id in await _run(get_selectable_user_ids, db, session_id, msg.order_item_id, current_user_participant_id)
     ]
     
     # Send the selectable participants to the user that asked for them
-    personal_message = SelectableParticipantsMessage(
+    personal_message = SelectableParticipantsMessage.model_construct(
         order_item_id=msg.order_item_id,
         selectable_participants=selectable_participants,
     )
-    await manager.send_personal_message(personal_message.model_dump(mode='json'), websocket)
+    await manager.send_model(personal_message, websocket)
 
 
 async def handle_get_paying_for_participants(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
@@ -309,468 +444,481 @@ async def handle_get_paying_for_participants(websocket: WebSocket, session_id: u
     msg = GetPayingForParticipantsMessage(**data)
     
     # Get the current user's participant_id
-    current_user_participant = get_participant_by_session_and_user(db, session_id, msg.user_id)
-    if not current_user_participant:
+    current_user_participant_id = await _run(get_participant_id_by_session_and_user, db, session_id, msg.user_id)
+    if not current_user_participant_id:
         # If user is not a participant, return empty list
-        personal_message = PayingForParticipantsMessage(
+        personal_message = PayingForParticipantsMessage.model_construct(
             order_item_id=msg.order_item_id,
             paying_for_participants=[]
         )
-        await manager.send_personal_message(personal_message.model_dump(mode='json'), websocket)
+        await manager.send_model(personal_message, websocket)
         return
     
     # Get all assignments for this specific order item
-    assignments = get_assignments_by_order_item_id(db, msg.order_item_id)
+    assignments = await _run(get_assignments_by_order_item_id, db, msg.order_item_id)
     
     # Find assignments where current user is the creditor and there is a debtor
     paying_for_debtor_ids = set()
     for assignment in assignments:
-        if assignment.creditor_id == current_user_participant.id and assignment.debtor_id is not None:
+        if assignment.creditor_id == current_user_participant_id and assignment.debtor_id is not None:
             paying_for_debtor_ids.add(assignment.debtor_id)
     
     # Get the participants for these debtor_ids and extract their user_ids
-    paying_for_participants = []
-    for debtor_id in paying_for_debtor_ids:
-        participant = get_participant_by_id(db, debtor_id)
-        if participant and participant.user_id is not None:
-            paying_for_participants.append(str(participant.user_id))
+    paying_for_participants = [
+        str(participant.user_id)
+        for participant in await _run(get_participants_by_ids, db, paying_for_debtor_ids)
+        if participant.user_id is not None
+    ]
     
     # Send the participants that the user is paying for
-    personal_message = PayingForParticipantsMessage(
+    personal_message = PayingForParticipantsMessage.model_construct(
         order_item_id=msg.order_item_id,
         paying_for_participants=paying_for_participants,
     )
-    await manager.send_personal_message(personal_message.model_dump(mode='json'), websocket)
+    await manager.send_model(personal_message, websocket)
 
 async def handle_assign_item(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle assign_item message."""
-    print(f"[WebSocket] handle_assign_item called with data: {data}")
+    logger.debug("[WebSocket] handle_assign_item called with data: %s", data)
     try:
-        # Check if session is locked
-        session = db.get(TableSession, session_id)
+        # Check if session is locked; writes go through the batch session, so reload the cached row
+        session = await _get_table_session(websocket, session_id, db)
+        if session:
+            await _run(db.refresh, session)
         if session and session.locked:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session is locked. Assignments cannot be modified."
-            })
+            await manager.send_error(websocket, "Session is locked. Assignments cannot be modified.")
             return
         
         msg = AssignItemMessage(**data)
-        print(f"[WebSocket] Parsed message: order_item_id={msg.order_item_id}, creditor_id={msg.creditor_id}, assigned_amount={msg.assigned_amount}")
+        logger.debug(
+            "[WebSocket] Parsed message: order_item_id=%s, creditor_id=%s, assigned_amount=%s",
+            msg.order_item_id, msg.creditor_id, msg.assigned_amount
+        )
+        
+        # Look up the order item's, creditor's and debtor's sessions in one query
+        item_session_id, creditor_session_id, debtor_session_id = await _run(
+            get_assignment_target_session_ids, db, msg.order_item_id, msg.creditor_id, msg.debtor_id
+        )
         
         # Verify order item belongs to session
-        order_item = get_order_item_by_id(db, msg.order_item_id)
-        belongs_to_session, error_msg = _validate_order_item_belongs_to_session(order_item, session_id)
+        belongs_to_session, error_msg = _validate_order_item_belongs_to_session(item_session_id, session_id)
         if not belongs_to_session:
-            await websocket.send_json({
-                "type": "error",
-                "message": error_msg
-            })
+            await manager.send_error(websocket, error_msg)
             return
         
         # Verify participants exist
-        creditor = get_participant_by_id(db, msg.creditor_id)
-        if not creditor or creditor.session_id != session_id:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Creditor participant not found"
-            })
+        if creditor_session_id != session_id:
+            await manager.send_error(websocket, "Creditor participant not found")
             return
         
-        if msg.debtor_id:
-            debtor = get_participant_by_id(db, msg.debtor_id)
-            if not debtor or debtor.session_id != session_id:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Debtor participant not found"
-                })
-                return
-
-        # Validate that the creditor is not present as a debtor in the list of assignments for the same order item
-        assignments = get_assignments_by_order_item_id(db, order_item.id)
-        for assignment in assignments:
-            if assignment.debtor_id == msg.creditor_id:
-                # Save assignment_id before deleting
-                assignment_id_to_remove = assignment.id
-                delete_assignment(db, assignment_id_to_remove)
-                # Broadcast to all (including sender so they get the update too)
-                broadcast_msg = AssignmentRemovedMessage(assignment_id=assignment_id_to_remove)
-                # Use model_dump with mode='json' to ensure UUIDs are serialized as strings
-                broadcast_data = broadcast_msg.model_dump(mode='json')
-                print(f"[WebSocket] Broadcasting assignment_removed: {broadcast_data}")
-                print(f"[WebSocket] Active connections for session {session_id}: {len(manager.active_connections.get(session_id, set()))}")
-                await manager.broadcast_to_session(
-                    broadcast_data,
-                    session_id,
-                    exclude=None  # Include sender so they get the update too
-                )
-
-        new_assignment_amount_per_person = _get_new_amount_per_assignment(order_item, db)
-        
-        assignment = create_assignment(
-            db,
-            msg.order_item_id,
-            msg.creditor_id,
-            msg.debtor_id,
-            new_assignment_amount_per_person
-        )
-
-        # Update all assignments on the same order item
-        assignments = get_assignments_by_order_item_id(db, order_item.id)
-        for assignment in assignments:
-            update_assignment(db, assignment.id, new_assignment_amount_per_person)
-            # Broadcast to all
-            broadcast_msg = AssignmentUpdatedMessage(
-                assignment_id=assignment.id,
-                assigned_amount=assignment.assigned_amount
-            )
-            await manager.broadcast_to_session(
-                broadcast_msg.model_dump(mode='json'),
-                session_id
-            )
+        if msg.debtor_id and debtor_session_id != session_id:
+            await manager.send_error(websocket, "Debtor participant not found")
+            return
 
-        # Broadcast the new assignment to all
-        broadcast_msg = ItemAssignedMessage(
-            assignment_id=assignment.id,
-            order_item_id=assignment.order_item_id,
-            creditor_id=assignment.creditor_id,
-            debtor_id=assignment.debtor_id,
-            assigned_amount=assignment.assigned_amount
-        )
-        await manager.broadcast_to_session(
-            broadcast_msg.model_dump(mode='json'),
-            session_id
-        )
+        # The write is applied with the rest of the session's burst and broadcast as assignments_changed
+        _enqueue_assignment_change(websocket, session_id, msg)
     
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to assign item: {str(e)}"
-        })
+        await manager.send_error(websocket, f"Failed to assign item: {str(e)}")
 
 
 async def handle_remove_assignment(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle remove_assignment message."""
     try:
-        # Check if session is locked
-        session = db.get(TableSession, session_id)
+        # Check if session is locked; writes go through the batch session, so reload the cached row
+        session = await _get_table_session(websocket, session_id, db)
+        if session:
+            await _run(db.refresh, session)
         if session and session.locked:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session is locked. Assignments cannot be modified."
-            })
+            await manager.send_error(websocket, "Session is locked. Assignments cannot be modified.")
             return
         
         msg = RemoveAssignmentMessage(**data)
         
-        assignment = get_assignment_by_id(db, msg.assignment_id)
+        # Load the assignment together with its order item's session
+        assignment, item_session_id = await _run(get_assignment_with_session_id, db, msg.assignment_id)
         if not assignment:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Assignment not found"
-            })
+            await manager.send_error(websocket, "Assignment not found")
             return
         
         # Verify assignment belongs to session
-        order_item = get_order_item_by_id(db, assignment.order_item_id)
-        belongs_to_session, error_msg = _validate_order_item_belongs_to_session(order_item, session_id)
+        belongs_to_session, error_msg = _validate_order_item_belongs_to_session(item_session_id, session_id)
         if not belongs_to_session:
-            await websocket.send_json({
-                "type": "error",
-                "message": error_msg
-            })
+            await manager.send_error(websocket, error_msg)
             return
         
-        # Calculate before deleting the assignment to prevent division by zero
-        new_assignment_amount_per_person = _get_new_amount_per_assignment(order_item, db, True)
+        # The write is applied with the rest of the session's burst and broadcast as assignments_changed
+        _enqueue_assignment_change(websocket, session_id, msg)
+    
+    except Exception as e:
+        await manager.send_error(websocket, f"Failed to remove assignment: {str(e)}")
 
-        delete_assignment(db, msg.assignment_id)
-        print(f"[WebSocket] Assignment {msg.assignment_id} deleted from database")
 
-        # Update all assignments on the same order item
-        assignments = get_assignments_by_order_item_id(db, order_item.id)
-        for assignment in assignments:
-            update_assignment(db, assignment.id, new_assignment_amount_per_person)
-            # Broadcast to all
-            broadcast_msg = AssignmentUpdatedMessage(
-                assignment_id=assignment.id,
-                assigned_amount=assignment.assigned_amount
-            )
-            await manager.broadcast_to_session(
-                broadcast_msg.model_dump(mode='json'),
-                session_id
-            )
+def _enqueue_assignment_change(websocket: WebSocket, session_id: uuid.UUID, msg: AssignItemMessage | RemoveAssignmentMessage):
+    """Queue an assign/remove write for the session, starting its flush task if none is running."""
+    queue = _pending_assignment_changes.get(session_id)
+    if queue is None:
+        queue = _pending_assignment_changes[session_id] = asyncio.Queue()
+        task = asyncio.create_task(_flush_assignment_changes(session_id, queue))
+        _assignment_flush_tasks.add(task)
+        task.add_done_callback(_assignment_flush_tasks.discard)
+    queue.put_nowait((websocket, msg))
 
-        # Broadcast to all (including sender so they get the update too)
-        broadcast_msg = AssignmentRemovedMessage(assignment_id=msg.assignment_id)
-        # Use model_dump with mode='json' to ensure UUIDs are serialized as strings
-        broadcast_data = broadcast_msg.model_dump(mode='json')
-        print(f"[WebSocket] Broadcasting assignment_removed: {broadcast_data}")
-        print(f"[WebSocket] Active connections for session {session_id}: {len(manager.active_connections.get(session_id, set()))}")
-        await manager.broadcast_to_session(
-            broadcast_data,
-            session_id,
-            exclude=None  # Include sender so they get the update
-        )
-        print(f"[WebSocket] assignment_removed broadcast completed")
-    
+
+async def _flush_assignment_changes(session_id: uuid.UUID, queue: asyncio.Queue):
+    """Apply a session's queued writes in batches until no new event arrives within the window."""
+    try:
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=ASSIGNMENT_BATCH_WINDOW)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    return
+                continue
+            
+            # Let the rest of the burst arrive before writing
+            await asyncio.sleep(ASSIGNMENT_BATCH_WINDOW)
+            batch = [first]
+            while len(batch) < ASSIGNMENT_BATCH_MAX_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            await _apply_assignment_batch(session_id, batch)
+    finally:
+        if _pending_assignment_changes.get(session_id) is queue:
+            del _pending_assignment_changes[session_id]
+
+
+async def _apply_assignment_batch(session_id: uuid.UUID, batch: list[tuple[WebSocket, AssignItemMessage | RemoveAssignmentMessage]]):
+    """Write a batch in one transaction, report skipped events to their senders and broadcast one update."""
+    try:
+        changes, errors = await _run(_apply_assignment_changes, session_id, batch)
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to remove assignment: {str(e)}"
-        })
+        logger.exception("[WebSocket] Failed to apply %d assignment changes", len(batch))
+        changes, errors = None, [(websocket, f"Failed to update assignments: {str(e)}") for websocket, _ in batch]
+    
+    for websocket, error in errors:
+        try:
+            await manager.send_error(websocket, error)
+        except Exception:
+            # The sender may have disconnected while the batch was pending
+            logger.debug("[WebSocket] Could not deliver assignment error to sender")
+    
+    if changes:
+        logger.debug("[WebSocket] Broadcasting assignments_changed for %d events", len(batch))
+        await manager.broadcast_model(changes, session_id)
 
 
-async def handle_calculate_equal_split(websocket: WebSocket, session_id: uuid.UUID, db: Session):
+def _apply_assignment_changes(
+    session_id: uuid.UUID,
+    batch: list[tuple[WebSocket, AssignItemMessage | RemoveAssignmentMessage]]
+) -> tuple[AssignmentsChangedMessage | None, list[tuple[WebSocket, str]]]:
+    """
+    Apply queued assign/remove events in a single transaction on a dedicated db session.
+    Returns the aggregated change message (None if nothing changed) and (websocket, error) for skipped events.
+    """
+    added: dict[uuid.UUID, dict] = {}
+    updated: dict[uuid.UUID, dict] = {}
+    removed: list[uuid.UUID] = []
+    errors = []
+    
+    def record_removed(assignment_id: uuid.UUID):
+        # An assignment created earlier in the same batch was never seen by the clients
+        if added.pop(assignment_id, None) is None:
+            removed.append(assignment_id)
+    
+    with SessionLocal() as db:
+        for websocket, msg in batch:
+            try:
+                if isinstance(msg, AssignItemMessage):
+                    order_item_id = msg.order_item_id
+                    order_item = get_order_item_by_id(db, order_item_id)
+                    
+                    # Remove the creditor from the debtors of the same order item
+                    assignments = get_assignments_by_order_item_id(db, order_item_id)
+                    for assignment in assignments:
+                        if assignment.debtor_id == msg.creditor_id:
+                            delete_assignment(db, assignment.id, commit=False)
+                            record_removed(assignment.id)
+                    assignments = [a for a in assignments if a.debtor_id != msg.creditor_id]
+                    
+                    new_amount = _get_new_amount_per_assignment(order_item, assignments)
+                    new_assignment = create_assignment(
+                        db,
+                        order_item_id,
+                        msg.creditor_id,
+                        msg.debtor_id,
+                        new_amount,
+                        commit=False
+                    )
+                    added[new_assignment.id] = {
+                        "id": new_assignment.id,
+                        "order_item_id": new_assignment.order_item_id,
+                        "creditor_id": new_assignment.creditor_id,
+                        "debtor_id": new_assignment.debtor_id,
+                        "assigned_amount": new_amount
+                    }
+                else:
+                    assignment = get_assignment_by_id(db, msg.assignment_id)
+                    if not assignment:
+                        # Already removed by an earlier event in the batch
+                        raise ValueError("Assignment not found")
+                    order_item_id = assignment.order_item_id
+                    order_item = get_order_item_by_id(db, order_item_id)
+                    
+                    # Calculate before deleting the assignment to prevent division by zero
+                    assignments = get_assignments_by_order_item_id(db, order_item_id)
+                    new_amount = _get_new_amount_per_assignment(order_item, assignments, True)
+                    delete_assignment(db, msg.assignment_id, commit=False)
+                    record_removed(msg.assignment_id)
+            except ValueError as e:
+                # Nothing was written for this event; the rest of the batch still goes ahead
+                action = "assign item" if isinstance(msg, AssignItemMessage) else "remove assignment"
+                errors.append((websocket, f"Failed to {action}: {str(e)}"))
+                continue
+            
+            # Rebalance every assignment on the item in one statement; later events on the item override
+            updated[order_item_id] = {
+                "order_item_id": order_item_id,
+                "assigned_amount": new_amount,
+                "assignment_ids": bulk_update_assignments_for_item(db, order_item_id, new_amount, commit=False)
+            }
+        
+        if not (added or updated or removed):
+            return None, errors
+        
+        # The lock may have landed while the events were queued; the writes above hold SQLite's write lock, so this read is final
+        if is_session_locked(db, session_id):
+            db.rollback()
+            return None, [(websocket, "Session is locked. Assignments cannot be modified.") for websocket, _ in batch]
+        
+        version = bump_session_version(db, session_id, commit=False)
+        db.commit()
+    
+    changes = AssignmentsChangedMessage.model_construct(
+        added=list(added.values()),
+        updated=list(updated.values()),
+        removed=removed,
+        version=version
+    )
+    return changes, errors
+
+
+async def handle_calculate_equal_split(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle calculate_equal_split message."""
     try:
-        session = db.get(TableSession, session_id)
+        session = await _get_table_session(websocket, session_id, db)
         if not session:
             return
         
-        # Get total amount
+        # Order items total and participant count, summed and counted in SQL
+        version = await _run(get_session_version, db, session_id)
+        stats = _get_cached(session_id, version, "equal_split_stats")
+        if stats is None:
+            stats = await _run(get_equal_split_stats, db, session_id)
+            if version is not None:
+                _set_cached(session_id, version, "equal_split_stats", stats)
+        items_total, participant_count = stats
+        
+        # Get total amount, falling back to the order items total
         total = session.total_amount or 0
         if total == 0:
-            # Calculate from order items
-            order_items = get_order_items_by_session_id(db, session_id)
-            total = sum(item.unit_price for item in order_items)
-        
-        # Get participant count
-        participants = get_participants_by_session_id(db, session_id)
-        participant_count = len(participants)
+            total = items_total
         
         if participant_count == 0:
-            await websocket.send_json({
-                "type": "error",
-                "message": "No participants in session"
-            })
+            await manager.send_error(websocket, "No participants in session")
             return
         
         amount_per_person = total // participant_count
         
         # Broadcast to all
-        broadcast_msg = EqualSplitCalculatedMessage(
+        broadcast_msg = EqualSplitCalculatedMessage.model_construct(
             total_amount=total,
             participant_count=participant_count,
             amount_per_person=amount_per_person
         )
-        await manager.broadcast_to_session(
-            broadcast_msg.model_dump(mode='json'),
+        await manager.broadcast_model(
+            broadcast_msg,
             session_id
         )
     
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to calculate equal split: {str(e)}"
-        })
+        await manager.send_error(websocket, f"Failed to calculate equal split: {str(e)}")
 
 
-async def handle_request_summary(websocket: WebSocket, session_id: uuid.UUID, db: Session):
+async def handle_request_summary(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle request_summary message."""
     try:
-        # Calculate summary: participant_id -> total_amount
-        assignments = get_assignments_by_session_id(db, session_id)
-        
-        summary = {}
-        for assignment in assignments:
-            creditor_id = str(assignment.creditor_id)
-            if creditor_id not in summary:
-                summary[creditor_id] = 0
-            summary[creditor_id] += assignment.assigned_amount
+        version = await _run(get_session_version, db, session_id)
+        payload = _get_cached(session_id, version, "summary")
+        if payload is None:
+            # Calculate summary: participant_id -> total_amount
+            summary = {
+                str(creditor_id): total
+                for creditor_id, total in (await _run(get_summary_by_session_id, db, session_id)).items()
+            }
+            payload = SummaryUpdatedMessage.model_construct(summary=summary).model_dump_json()
+            if version is not None:
+                _set_cached(session_id, version, "summary", payload)
         
         # Send to the user that requested the summary
-        personal_msg = SummaryUpdatedMessage(summary=summary)
-        await manager.send_personal_message(
-            personal_msg.model_dump(mode='json'),
-            websocket
-        )
+        await websocket.send_text(payload)
     
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to calculate summary: {str(e)}"
-        })
+        await manager.send_error(websocket, f"Failed to calculate summary: {str(e)}")
 
 
-async def handle_validate_assignments(websocket: WebSocket, session_id: uuid.UUID, db: Session):
+async def handle_validate_assignments(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle validate_assignments message."""
     try:
-        # Get session
-        session = db.get(TableSession, session_id)
+        # Get session, reloading the cached row so the lock change below is flushed against current values
+        session = await _get_table_session(websocket, session_id, db)
         if not session:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session not found"
-            })
+            await manager.send_error(websocket, "Session not found")
             return
+        await _run(db.refresh, session)
         
-        # Get user_id from websocket participant
-        participant_id = _websocket_participants.get(websocket)
+        # Get user_id from websocket participant (cached on join)
+        participant_id = getattr(websocket.state, "participant_id", None)
+        user_id = getattr(websocket.state, "user_id", None)
         if not participant_id:
-            await websocket.send_json({
-                "type": "error",
-                "message": "User not found in session"
-            })
+            await manager.send_error(websocket, "User not found in session")
             return
         
-        participant = get_participant_by_id(db, participant_id)
-        if not participant or not participant.user_id:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Participant user not found"
-            })
+        if not user_id:
+            await manager.send_error(websocket, "Participant user not found")
             return
         
-        user_id = participant.user_id
-        
-        # Get all order items
-        order_items = get_order_items_by_session_id(db, session_id)
-        
-        # Get all assignments
-        assignments = get_assignments_by_session_id(db, session_id)
-        
         # Check which items are fully assigned
-        assigned_items = {a.order_item_id for a in assignments}
-        total_assigned = sum(a.assigned_amount for a in assignments)
-        total_items = sum(item.unit_price for item in order_items)
-        
-        unassigned_items = [
-            str(item.id) for item in order_items
-            if item.id not in assigned_items
-        ]
+        unassigned_item_ids, all_assigned = await _run(get_validation_stats, db, session_id)
+        unassigned_items = [str(item_id) for item_id in unassigned_item_ids]
         
-        all_assigned = len(unassigned_items) == 0 and total_assigned >= total_items
-        
-        # Lock the session
+        # Lock the session; the version is bumped in SQL, the cached row may be behind other connections' writes
         session.locked = True
         session.locked_by_user_id = user_id
         db.add(session)
-        db.commit()
+        version = await _run(bump_session_version, db, session_id)
         
         # Broadcast validation result
-        broadcast_msg = AssignmentsValidatedMessage(
+        broadcast_msg = AssignmentsValidatedMessage.model_construct(
             all_assigned=all_assigned,
             unassigned_items=unassigned_items
         )
-        await manager.broadcast_to_session(
-            broadcast_msg.model_dump(mode='json'),
+        await manager.broadcast_model(
+            broadcast_msg,
             session_id
         )
         
         # Broadcast lock message
-        lock_msg = SessionLockedMessage(locked_by_user_id=user_id)
-        await manager.broadcast_to_session(
-            lock_msg.model_dump(mode='json'),
+        lock_msg = SessionLockedMessage.model_construct(locked_by_user_id=user_id, version=version)
+        await manager.broadcast_model(
+            lock_msg,
             session_id
         )
     
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to validate assignments: {str(e)}"
-        })
+        await _run(db.rollback)
+        await manager.send_error(websocket, f"Failed to validate assignments: {str(e)}")
 
 
-async def handle_unlock_session(websocket: WebSocket, session_id: uuid.UUID, db: Session):
+async def handle_unlock_session(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle unlock_session message."""
     try:
-        # Get session
-        session = db.get(TableSession, session_id)
+        # Get session, reloading the cached row so the lock status is current
+        session = await _get_table_session(websocket, session_id, db)
         if not session:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session not found"
-            })
+            await manager.send_error(websocket, "Session not found")
             return
+        await _run(db.refresh, session)
         
         # Check if session is locked
         if not session.locked:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session is not locked"
-            })
+            await manager.send_error(websocket, "Session is not locked")
             return
         
-        # Get user_id from websocket participant
-        participant_id = _websocket_participants.get(websocket)
+        # Get user_id from websocket participant (cached on join)
+        participant_id = getattr(websocket.state, "participant_id", None)
+        user_id = getattr(websocket.state, "user_id", None)
         if not participant_id:
-            await websocket.send_json({
-                "type": "error",
-                "message": "User not found in session"
-            })
+            await manager.send_error(websocket, "User not found in session")
             return
         
-        participant = get_participant_by_id(db, participant_id)
-        if not participant or not participant.user_id:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Participant user not found"
-            })
+        if not user_id:
+            await manager.send_error(websocket, "Participant user not found")
             return
         
-        user_id = participant.user_id
-        
         # Check if this user is the one who locked it
         if session.locked_by_user_id != user_id:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Only the user who locked the session can unlock it"
-            })
+            await manager.send_error(websocket, "Only the user who locked the session can unlock it")
             return
         
-        # Unlock the session
+        # Unlock the session; the version is bumped in SQL, as for the lock
         session.locked = False
         session.locked_by_user_id = None
         db.add(session)
-        db.commit()
+        version = await _run(bump_session_version, db, session_id)
         
         # Broadcast unlock message
-        unlock_msg = SessionUnlockedMessage()
-        await manager.broadcast_to_session(
-            unlock_msg.model_dump(mode='json'),
+        unlock_msg = SessionUnlockedMessage.model_construct(version=version)
+        await manager.broadcast_model(
+            unlock_msg,
             session_id
         )
     
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to unlock session: {str(e)}"
-        })
+        await _run(db.rollback)
+        await manager.send_error(websocket, f"Failed to unlock session: {str(e)}")
 
 
-async def handle_finalize_session(websocket: WebSocket, session_id: uuid.UUID, db: Session):
+async def handle_finalize_session(websocket: WebSocket, session_id: uuid.UUID, data: dict, db: Session):
     """Handle finalize_session message."""
     try:
-        session = db.get(TableSession, session_id)
+        session = await _get_table_session(websocket, session_id, db)
         if not session:
             return
         
-        # Calculate total from assignments
-        assignments = get_assignments_by_session_id(db, session_id)
-        
-        total_amount = sum(a.assigned_amount for a in assignments)
-        
-        session.total_amount = total_amount
-        session.status = "closed"
-        session.session_end = datetime.now()
-        db.add(session)
-        db.commit()
+        # Sum and commit in one worker-thread hop; the loop keeps serving other sessions meanwhile
+        total_amount, version = await _run(_finalize_session, db, session)
         
         # Broadcast to all
-        broadcast_msg = SessionFinalizedMessage(
+        broadcast_msg = SessionFinalizedMessage.model_construct(
             session_id=session_id,
             total_amount=total_amount,
-            ready_for_invoices=True
+            ready_for_invoices=True,
+            version=version
         )
-        await manager.broadcast_to_session(
-            broadcast_msg.model_dump(mode='json'),
+        await manager.broadcast_model(
+            broadcast_msg,
             session_id
         )
     
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": f"Failed to finalize session: {str(e)}"
-        })
+        await _run(db.rollback)
+        await manager.send_error(websocket, f"Failed to finalize session: {str(e)}")
+
 
+def _finalize_session(db: Session, session: TableSession) -> tuple[int, int]:
+    """Close the session with its assigned total and commit; returns the total and the new version."""
+    # Calculate total from assignments
+    total_amount = get_assigned_total_by_session_id(db, session.id)
+    
+    session.total_amount = total_amount
+    session.status = "closed"
+    session.session_end = datetime.now()
+    db.add(session)
+    version = bump_session_version(db, session.id)
+    return total_amount, version
+
+
+# Message type -> handler; every handler takes (websocket, session_id, data, db)
+_HANDLERS = {
+    "join_session": handle_join_session,
+    "get_selectable_participants": handle_get_selectable_participants,
+    "get_paying_for_participants": handle_get_paying_for_participants,
+    "assign_item": handle_assign_item,
+    "remove_assignment": handle_remove_assignment,
+    "calculate_equal_split": handle_calculate_equal_split,
+    "request_summary": handle_request_summary,
+    "validate_assignments": handle_validate_assignments,
+    "unlock_session": handle_unlock_session,
+    "finalize_session": handle_finalize_session,
+}
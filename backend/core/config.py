@@ -1,4 +1,5 @@
 from datetime import timezone
+from functools import cached_property
 from typing import Annotated, Any, Literal
 from zoneinfo import ZoneInfo
 
@@ -34,11 +35,26 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     JWT_ALGORITHM: str
 
+    # Logging level for the app (e.g. DEBUG to trace WebSocket traffic)
+    LOG_LEVEL: str = "INFO"
+
     # Timezone configuration
     TIMEZONE: str = "America/Santiago"
 
     # Database configuration
     SQLITE_FILE_NAME: str
+    # Connection pool; sized so the sync endpoints' thread pool (40 threads) doesn't queue on connections
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    # Prepared statements kept per connection by sqlite3 (its default of 128 is below the app's distinct queries)
+    DB_STATEMENT_CACHE_SIZE: int = 512
+
+    # Redis pub/sub for WebSocket broadcasts across workers (in-process if unset)
+    REDIS_URL: str | None = None
+
+    # WebSocket broadcasts send to this many sockets at once, yielding to the event loop between batches
+    WS_BROADCAST_BATCH_SIZE: int = 50
 
     # OAUTH2
     GOOGLE_CLIENT_ID: str
@@ -50,9 +66,9 @@ class Settings(BaseSettings):
         return f"sqlite:///{self.SQLITE_FILE_NAME}"
 
     @computed_field  # type: ignore[prop-decorator]
-    @property
+    @cached_property
     def APP_TIMEZONE(self) -> ZoneInfo:  # noqa
-        """Get the timezone object for the configured timezone string."""
+        """Get the timezone object for the configured timezone string (resolved once)."""
         return ZoneInfo(self.TIMEZONE)
 
 settings = Settings()  # type: ignore
@@ -1,25 +1,35 @@
 import jwt
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 from passlib.context import CryptContext
 
 from core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context: new hashes use argon2id; existing bcrypt hashes still verify and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
     
-    now = datetime.now(settings.APP_TIMEZONE)
+    # JWT claims are epoch seconds; skip building timezone-aware datetimes
+    now = int(time.time())
     if expires_delta:
-        expire = now + expires_delta
+        expire = now + int(expires_delta.total_seconds())
     else:
         # Default to 7 days
-        expire = now + timedelta(days=7)
+        expire = now + int(timedelta(days=7).total_seconds())
     
     to_encode.update({"exp": expire, "iat": now})
     
@@ -31,21 +41,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT access token."""
+@lru_cache(maxsize=4096)
+def _decode_verified(token: str) -> Optional[dict]:
+    """
+    Verify a token's signature once and cache the payload.
+    The token embeds its own signature, so the token string is a safe cache key.
+    Expiry is checked by the caller on every use, not here.
+    """
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token,
             settings.SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
+            algorithms=[settings.JWT_ALGORITHM],
+            options={"verify_exp": False}
         )
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
     except jwt.InvalidTokenError:
         return None
 
 
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode and verify a JWT access token."""
+    payload = _decode_verified(token)
+    if payload is None:
+        return None
+    if "exp" in payload and payload["exp"] <= time.time():
+        return None
+    # Copy so callers can't mutate the cached payload
+    return dict(payload)
+
+
 def get_user_id_from_token(token: str) -> Optional[UUID]:
     """Extract user ID from JWT token."""
     payload = decode_access_token(token)
@@ -62,6 +86,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one uses a deprecated scheme."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
@@ -6,33 +6,40 @@ If restaurant or user don't exist, they will be created.
 import sys
 import uuid
 import secrets
+from datetime import datetime
+from sqlalchemy import RowMapping
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import select, Session
 
+from core.config import settings
 from db.session import SessionLocal
 from models.restaurants import Restaurant
 from models.restaurant_tables import RestaurantTable
 from models.users import User
 
 
-def get_or_create_user(db: Session, email: str = "admin@yopagocl.com", name: str = "Admin User") -> User:
-    """Get existing user or create a new one."""
-    user = db.scalars(select(User).where(User.email == email)).first()
-    
-    if user:
-        print(f"✓ Using existing user: {user.email} (ID: {user.id})")
-        return user
-    
-    # Create new user
-    user = User(
-        id=uuid.uuid4(),
+def get_or_create_user(db: Session, email: str = "admin@yopagocl.com", name: str = "Admin User") -> RowMapping:
+    """Get existing user or create a new one with a single upsert."""
+    now = datetime.now(settings.APP_TIMEZONE)
+    new_id = uuid.uuid4()
+    stmt = insert(User).values(
+        id=new_id,
         email=email,
         name=name,
-        hashed_password=None
+        hashed_password=None,
+        created_at=now,
+        updated_at=now
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    print(f"✓ Created new user: {user.email} (ID: {user.id})")
+    # No-op update on conflict so RETURNING also yields the existing row
+    user = db.exec(
+        stmt.on_conflict_do_update(index_elements=[User.email], set_={"email": stmt.excluded.email})
+        .returning(User.id, User.email, User.name)
+    ).mappings().one()
+    
+    if user["id"] == new_id:
+        print(f"✓ Created new user: {user['email']} (ID: {user['id']})")
+    else:
+        print(f"✓ Using existing user: {user['email']} (ID: {user['id']})")
     return user
 
 
@@ -40,66 +47,67 @@ def get_or_create_restaurant(
     db: Session,
     rut: str,
     name: str,
-    owner: User,
+    owner_id: uuid.UUID,
     slug: str | None = None
-) -> Restaurant:
-    """Get existing restaurant or create a new one."""
-    restaurant = db.get(Restaurant, rut)
-    
-    if restaurant:
-        print(f"✓ Using existing restaurant: {restaurant.name} (RUT: {restaurant.rut})")
-        return restaurant
-    
+) -> RowMapping:
+    """Get existing restaurant or create a new one with an insert-or-ignore."""
     # Generate slug if not provided
     if slug is None:
         slug = name.lower().replace(" ", "-")[:100]
         # Ensure slug is unique
-        existing = db.scalars(select(Restaurant).where(Restaurant.slug == slug)).first()
+        existing = db.scalars(select(Restaurant.rut).where(Restaurant.slug == slug, Restaurant.rut != rut)).first()
         if existing:
             slug = f"{slug}-{secrets.token_urlsafe(4)[:8]}"
     
-    # Create new restaurant
-    restaurant = Restaurant(
+    now = datetime.now(settings.APP_TIMEZONE)
+    stmt = insert(Restaurant).values(
         rut=rut,
         name=name,
         slug=slug,
-        owner=owner.id,
-        description=f"Restaurant {name}"
+        owner=owner_id,
+        description=f"Restaurant {name}",
+        created_at=now,
+        updated_at=now
     )
-    db.add(restaurant)
-    db.commit()
-    db.refresh(restaurant)
-    print(f"✓ Created new restaurant: {restaurant.name} (RUT: {restaurant.rut})")
+    # RETURNING yields nothing when the RUT already existed, which is the explicit "not created" signal
+    created_rut = db.exec(
+        stmt.on_conflict_do_nothing(index_elements=[Restaurant.rut]).returning(Restaurant.rut)
+    ).scalar_one_or_none()
+    restaurant = db.exec(
+        select(Restaurant.rut, Restaurant.name).where(Restaurant.rut == rut)
+    ).mappings().one()
+    
+    if created_rut is not None:
+        print(f"✓ Created new restaurant: {restaurant['name']} (RUT: {restaurant['rut']})")
+    else:
+        print(f"✓ Using existing restaurant: {restaurant['name']} (RUT: {restaurant['rut']})")
     return restaurant
 
 
 def get_or_create_table(
     db: Session,
-    restaurant: Restaurant,
+    restaurant_id: str,
     table_number: str = "1"
-) -> RestaurantTable:
-    """Get existing table or create a new one."""
-    # Check if table already exists
-    existing_table = db.scalars(
-        select(RestaurantTable).where(
-            RestaurantTable.restaurant_id == restaurant.rut,
-            RestaurantTable.table_number == table_number
-        )
-    ).first()
-    
-    if existing_table:
-        print(f"✓ Using existing table: {table_number} (ID: {existing_table.id})")
-        return existing_table
-    
-    # Create new table
-    table = RestaurantTable(
-        restaurant_id=restaurant.rut,
+) -> RowMapping:
+    """Get existing table or create a new one with a single upsert."""
+    new_id = uuid.uuid4()
+    stmt = insert(RestaurantTable).values(
+        id=new_id,
+        restaurant_id=restaurant_id,
         table_number=table_number
     )
-    db.add(table)
-    db.commit()
-    db.refresh(table)
-    print(f"✓ Created new table: {table_number} (ID: {table.id})")
+    table = db.exec(
+        stmt.on_conflict_do_update(
+            index_elements=[RestaurantTable.restaurant_id, RestaurantTable.table_number],
+            set_={"table_number": stmt.excluded.table_number}
+        )
+        .returning(RestaurantTable.id, RestaurantTable.table_number)
+    ).mappings().one()
+    
+    if table["id"] == new_id:
+        print(f"✓ Created new table: {table_number} (ID: {table['id']})")
+    else:
+        print(f"✓ Using existing table: {table_number} (ID: {table['id']})")
     return table
 
 
@@ -147,36 +155,38 @@ def main():
     db = SessionLocal()
     
     try:
-        # Get or create user
-        user = get_or_create_user(db, args.user_email, args.user_name)
-        
-        # Get or create restaurant
-        restaurant = get_or_create_restaurant(
-            db,
-            rut=args.rut,
-            name=args.name,
-            owner=user
-        )
-        
-        # Get or create table
-        table = get_or_create_table(
-            db,
-            restaurant=restaurant,
-            table_number=args.table_number
-        )
+        # All three upserts share one transaction and a single commit
+        with db.begin():
+            # Get or create user
+            user = get_or_create_user(db, args.user_email, args.user_name)
+            
+            # Get or create restaurant
+            restaurant = get_or_create_restaurant(
+                db,
+                rut=args.rut,
+                name=args.name,
+                owner_id=user["id"]
+            )
+            
+            # Get or create table
+            table = get_or_create_table(
+                db,
+                restaurant_id=restaurant["rut"],
+                table_number=args.table_number
+            )
         
         print("\n" + "="*60)
         print("✓ Success! Restaurant and table created/retrieved:")
         print("="*60)
-        print(f"  Restaurant RUT: {restaurant.rut}")
-        print(f"  Restaurant Name: {restaurant.name}")
-        print(f"  Table Number: {table.table_number}")
-        print(f"  Table ID: {table.id}")
-        print(f"  Owner: {user.name} ({user.email})")
+        print(f"  Restaurant RUT: {restaurant['rut']}")
+        print(f"  Restaurant Name: {restaurant['name']}")
+        print(f"  Table Number: {table['table_number']}")
+        print(f"  Table ID: {table['id']}")
+        print(f"  Owner: {user['name']} ({user['email']})")
         print("="*60)
         print("\nYou can now use these values in create_session_qr.py:")
-        print(f"  --restaurant-id {restaurant.rut}")
-        print(f"  --table-id {table.id}")
+        print(f"  --restaurant-id {restaurant['rut']}")
+        print(f"  --table-id {table['id']}")
         
     except Exception as e:
         print(f"✗ Error: {e}")
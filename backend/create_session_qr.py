@@ -3,14 +3,17 @@
 Script to create a table session and generate a QR code with the deep link.
 The QR code contains: yopagocl://session/{session_id}
 """
+import atexit
 import sys
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from sqlmodel import select
 
 import httpx
 import qrcode
+from qrcode.image.pure import PyPNGImage
 
 from db.session import SessionLocal
 from models.restaurants import Restaurant
@@ -20,6 +23,10 @@ from models.restaurant_tables import RestaurantTable
 BASE_URL = "http://localhost:8000"  # Change this to your backend URL
 API_ENDPOINT = f"{BASE_URL}/api/table_sessions"
 
+# One pooled client for the whole run, so repeated session creation reuses the keep-alive connection
+_client = httpx.Client(timeout=30.0)
+atexit.register(_client.close)
+
 
 def create_session(restaurant_id: str, table_id: str, items: list[dict] = None) -> dict:
     """
@@ -47,13 +54,12 @@ def create_session(restaurant_id: str, table_id: str, items: list[dict] = None)
     print(f"Session data: {session_data}")
     
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(API_ENDPOINT, json=session_data)
-            response.raise_for_status()
-            session = response.json()
-            print(f"✓ Session created successfully!")
-            print(f"  Session ID: {session['id']}")
-            return session
+        response = _client.post(API_ENDPOINT, json=session_data)
+        response.raise_for_status()
+        session = response.json()
+        print(f"✓ Session created successfully!")
+        print(f"  Session ID: {session['id']}")
+        return session
     except httpx.HTTPStatusError as e:
         print(f"✗ Error creating session: {e.response.status_code}")
         print(f"  Response: {e.response.text!s}")
@@ -77,20 +83,21 @@ def get_first_restaurant_and_table() -> tuple[str, str]:
     Returns:
         Tuple of (restaurant_id, table_id)
     """
-    db = SessionLocal()
-    try:
-        # Get first restaurant
-        restaurant = db.scalars(select(Restaurant)).first()
+    # One explicit transaction for both lookups, with no flush triggered before each query
+    with SessionLocal() as db, db.begin():
+        db.autoflush = False
+        # Get first restaurant, only the columns that are printed and sent on
+        restaurant = db.exec(select(Restaurant.rut, Restaurant.name).limit(1)).first()
         if not restaurant:
             print("✗ Error: No restaurants found in database.")
             print("  Run create_restaurant_table.py first to create a restaurant and table.")
             sys.exit(1)
         
         # Get first table for this restaurant
-        table = db.scalars(
-            select(RestaurantTable).where(
+        table = db.exec(
+            select(RestaurantTable.id, RestaurantTable.table_number).where(
                 RestaurantTable.restaurant_id == restaurant.rut
-            )
+            ).limit(1)
         ).first()
         
         if not table:
@@ -102,8 +109,30 @@ def get_first_restaurant_and_table() -> tuple[str, str]:
         print(f"✓ Using table: {table.table_number} (ID: {table.id})")
         
         return restaurant.rut, str(table.id)
-    finally:
-        db.close()
+
+
+@lru_cache(maxsize=1)
+def _make_qr() -> qrcode.QRCode:
+    """Build the QR code instance once; callers clear its data before reuse."""
+    return qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+        # pypng writes the PNG straight from the module matrix, without a Pillow raster buffer
+        image_factory=PyPNGImage,
+    )
+
+
+@lru_cache(maxsize=128)
+def _render_qr(deep_link: str):
+    """Render the QR image for a deep link, reusing the image when a link is rendered again."""
+    qr = _make_qr()
+    # Reset only the data buffer; every session link has the same length, so the fitted version stays valid
+    qr.clear()
+    qr.add_data(deep_link)
+    qr.make(fit=True)
+    return qr.make_image()
 
 
 def generate_qr_code(session_id: str, output_path: str = None) -> str:
@@ -124,19 +153,8 @@ def generate_qr_code(session_id: str, output_path: str = None) -> str:
     qr_dir = Path("qr_codes")
     qr_dir.mkdir(exist_ok=True)
     
-    # Create QR code instance
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    
-    qr.add_data(deep_link)
-    qr.make(fit=True)
-    
     # Create image
-    img = qr.make_image(fill_color="black", back_color="white")
+    img = _render_qr(deep_link)
     
     # Determine output path
     if output_path is None:
@@ -147,7 +165,8 @@ def generate_qr_code(session_id: str, output_path: str = None) -> str:
     
     # Save to qr_codes directory
     output_path = qr_dir / filename
-    img.save(output_path)
+    with open(output_path, "wb") as stream:
+        img.save(stream)
     
     print(f"✓ QR code saved to: {output_path}")
     print(f"  Deep link: {deep_link}")
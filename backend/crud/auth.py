@@ -1,12 +1,20 @@
 import uuid
+from datetime import datetime
+from sqlalchemy import case
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import select, Session
 from models.users import User
-from core.security import get_password_hash, verify_password
+from crud.table_sessions import bump_user_session_versions
+from core.security import get_password_hash, verify_and_update_password, verify_password
+from core.config import settings
 
 # Sentinel value to distinguish "not provided" from "explicitly set to None"
 # Made public so it can be imported by routers
 NOT_PROVIDED = object()
 
+# Verified against when there is no stored hash, so unknown emails cost as much as wrong passwords
+_DUMMY_HASH = get_password_hash("dummy-password-for-timing")
+
 
 def get_or_create_user_from_oauth(
     db: Session,
@@ -15,28 +23,32 @@ def get_or_create_user_from_oauth(
     google_id: str | None = None
 ) -> User:
     """Get existing user or create new user from OAuth data."""
-    # Try to find existing user by email
-    user = db.scalars(select(User).where(User.email == email)).first()
-    
-    if user:
-        # Update name if it changed
-        if user.name != name:
-            user.name = name
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+    # Plain read first: a returning user whose name is unchanged never takes SQLite's write lock
+    user = db.exec(select(User).where(User.email == email)).first()
+    if user and user.name == name:
         return user
     
-    # Create new user
-    user = User(
+    now = datetime.now(settings.APP_TIMEZONE)
+    stmt = insert(User).values(
         id=uuid.uuid4(),
         email=email,
         name=name,
-        hashed_password=None  # OAuth users don't have passwords
+        hashed_password=None,  # OAuth users don't have passwords
+        created_at=now,
+        updated_at=now
     )
-    db.add(user)
+    # Missing or renamed: one upsert, also covering a concurrent insert; updated_at only moves if the name differs
+    name_changed = User.name != stmt.excluded.name
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.email],
+        set_={
+            "name": stmt.excluded.name,
+            "updated_at": case((name_changed, stmt.excluded.updated_at), else_=User.updated_at)
+        }
+    ).returning(User)
+    
+    user = db.exec(stmt, execution_options={"populate_existing": True}).scalar_one()
     db.commit()
-    db.refresh(user)
     
     return user
 
@@ -80,17 +92,23 @@ def authenticate_user(
     """Authenticate a user with email and password."""
     user = db.scalars(select(User).where(User.email == email)).first()
     
-    if not user:
-        return None
-    
     # Check if user has a password (not OAuth-only user)
-    if not user.hashed_password:
+    if not user or not user.hashed_password:
+        verify_password(password, _DUMMY_HASH)
         return None
     
     # Verify password
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return None
     
+    # Rehash passwords stored with a deprecated scheme (e.g. bcrypt -> argon2id)
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    
     return user
 
 
@@ -115,16 +133,29 @@ def update_user(
     Returns:
         Updated user
     """
-    if name is not NOT_PROVIDED:
-        user.name = name
-    if phone is not NOT_PROVIDED:
-        user.phone = phone
-    if avatar_url is not NOT_PROVIDED:
-        user.avatar_url = avatar_url
-    if push_notification_token is not NOT_PROVIDED:
-        user.push_notification_token = push_notification_token
+    fields = {
+        "name": name,
+        "phone": phone,
+        "avatar_url": avatar_url,
+        "push_notification_token": push_notification_token
+    }
+    changes = {
+        field: value for field, value in fields.items()
+        if value is not NOT_PROVIDED and getattr(user, field) != value
+    }
+    
+    # Nothing changed: skip the UPDATE, commit and reload entirely
+    if not changes:
+        return user
+    
+    # The flush only writes the changed columns
+    for field, value in changes.items():
+        setattr(user, field, value)
     
     db.add(user)
+    if "name" in changes or "avatar_url" in changes:
+        # Session state shows participants' names and avatars; new versions keep it from being served stale
+        bump_user_session_versions(db, user.id, commit=False)
     db.commit()
     db.refresh(user)
     
@@ -1,9 +1,18 @@
 import uuid
 import secrets
+from datetime import datetime
+from sqlalchemy import exists
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from sqlmodel import select, Session
 from models.groups import Group
 from models.group_members import GroupMember
 from schemas.groups import GroupCreate, GroupUpdate
+from core.config import settings
+
+# Inserts retried on a slug collision before giving up
+SLUG_MAX_ATTEMPTS = 5
 
 
 def generate_slug() -> str:
@@ -17,28 +26,27 @@ def create_group(
     created_by: uuid.UUID
 ) -> Group:
     """Create a new group."""
-    slug = generate_slug()
-    
-    # Ensure slug is unique
-    while db.exec(select(Group).where(Group.slug == slug)).first():
-        slug = generate_slug()
-    
-    group = Group(
-        name=group_data.name,
-        slug=slug,
-        description=group_data.description,
-        currency=group_data.currency,
-        created_by=created_by
-    )
-    db.add(group)
-    db.commit()
+    # The unique index on slug catches the rare collision; no lookup before inserting
+    for attempt in range(SLUG_MAX_ATTEMPTS):
+        group = Group(
+            name=group_data.name,
+            slug=generate_slug(),
+            description=group_data.description,
+            currency=group_data.currency,
+            created_by=created_by
+        )
+        db.add(group)
+        # Add creator as member; the id is generated client-side, so both rows go in one commit
+        db.add(GroupMember(group_id=group.id, user_id=created_by))
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt == SLUG_MAX_ATTEMPTS - 1:
+                raise
     db.refresh(group)
     
-    # Add creator as member
-    member = GroupMember(group_id=group.id, user_id=created_by)
-    db.add(member)
-    db.commit()
-    
     return group
 
 
@@ -107,27 +115,31 @@ def add_group_member(
     """Add member to group."""
     from sqlalchemy.orm import selectinload
     
-    # Check if user is already a member
-    existing = db.exec(
-        select(GroupMember).where(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == user_id
+    # Insert unless already a member; the unique (group_id, user_id) constraint decides in one statement
+    member_id = db.exec(
+        insert(GroupMember)
+        .values(
+            id=uuid.uuid4(),
+            group_id=group_id,
+            user_id=user_id,
+            joined_at=datetime.now(settings.APP_TIMEZONE)
         )
-    ).first()
+        .on_conflict_do_nothing(index_elements=[GroupMember.group_id, GroupMember.user_id])
+        .returning(GroupMember.id)
+    ).scalar_one_or_none()
     
-    if existing:
+    if member_id is None:
+        db.rollback()
         return None  # Already a member
     
-    member = GroupMember(group_id=group_id, user_id=user_id)
-    db.add(member)
     db.commit()
-    db.refresh(member)
+    _forget_group_member_ids(db, group_id)
     
     # Eagerly load user relationship
     statement = (
         select(GroupMember)
         .options(selectinload(GroupMember.user))
-        .where(GroupMember.id == member.id)
+        .where(GroupMember.id == member_id)
     )
     member_with_user = db.exec(statement).first()
     
@@ -152,9 +164,15 @@ def remove_group_member(
     
     db.delete(member)
     db.commit()
+    _forget_group_member_ids(db, group_id)
     return True
 
 
+def _forget_group_member_ids(db: Session, group_id: uuid.UUID):
+    """Drop the session's cached member ids for a group (see crud.invoices.get_group_member_ids)."""
+    db.info.get("group_member_ids", {}).pop(group_id, None)
+
+
 def list_group_members(
     db: Session,
     group_id: uuid.UUID
@@ -178,13 +196,15 @@ def check_user_in_group(
     user_id: uuid.UUID
 ) -> bool:
     """Check if user is a member of the group."""
-    member = db.exec(
-        select(GroupMember).where(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == user_id
+    # EXISTS stops at the first index hit and returns a bare boolean, no row is loaded
+    return db.exec(
+        select(
+            exists().where(
+                GroupMember.group_id == group_id,
+                GroupMember.user_id == user_id
+            )
         )
-    ).first()
-    return member is not None
+    ).one()
 
 
 def get_common_groups_for_users(
@@ -193,24 +213,12 @@ def get_common_groups_for_users(
     user2_id: uuid.UUID
 ) -> list[Group]:
     """Get groups where both users are members."""
-    # Get groups for user1
-    user1_groups = db.exec(
-        select(GroupMember.group_id).where(GroupMember.user_id == user1_id)
-    ).all()
-    
-    # Get groups for user2
-    user2_groups = db.exec(
-        select(GroupMember.group_id).where(GroupMember.user_id == user2_id)
-    ).all()
-    
-    # Find intersection
-    common_group_ids = set(user1_groups) & set(user2_groups)
-    
-    if not common_group_ids:
-        return []
-    
-    # Get group details
+    # Intersect the two memberships in SQL with a self-join on group_members
+    member1 = aliased(GroupMember)
+    member2 = aliased(GroupMember)
     return db.exec(
-        select(Group).where(Group.id.in_(common_group_ids))
+        select(Group)
+        .join(member1, member1.group_id == Group.id)
+        .join(member2, member2.group_id == Group.id)
+        .where(member1.user_id == user1_id, member2.user_id == user2_id)
     ).all()
-
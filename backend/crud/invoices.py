@@ -1,12 +1,39 @@
 import uuid
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import insert, update
 from sqlmodel import select, Session
 from models.invoices import Invoice
 from models.invoice_items import InvoiceItem
 from models.item_assignments import ItemAssignment
 from models.table_participants import TableParticipant
-from schemas.invoices import InvoiceCreate, InvoiceUpdate, InvoiceMarkPaid
+from schemas.invoices import InvoiceCreate, InvoiceUpdate, InvoiceMarkPaid, InvoiceResponse
+
+# Columns read by InvoiceResponse; list endpoints select just these as plain rows instead of ORM objects
+RESPONSE_COLUMNS = tuple(getattr(Invoice, name) for name in InvoiceResponse.model_fields)
+
+# Invoice list pages: the size used when none is given, and the largest allowed
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_group_member_ids(
+    db: Session,
+    group_id: uuid.UUID
+) -> set[uuid.UUID]:
+    """
+    Get the user ids of a group's members, cached on the db session.
+    The session is request-scoped, so a request validating many invoices for one group queries it once.
+    """
+    # Import here to avoid circular dependency
+    from models.group_members import GroupMember
+    
+    cache = db.info.setdefault("group_member_ids", {})
+    if group_id not in cache:
+        cache[group_id] = set(db.exec(
+            select(GroupMember.user_id).where(GroupMember.group_id == group_id)
+        ).all())
+    return cache[group_id]
 
 
 def validate_user_in_group(
@@ -15,17 +42,7 @@ def validate_user_in_group(
     user_id: uuid.UUID
 ) -> tuple[bool, Optional[str]]:
     """Validate that a user is in the group. Returns (is_valid, error_message)."""
-    # Import here to avoid circular dependency
-    from models.group_members import GroupMember
-    
-    member = db.exec(
-        select(GroupMember).where(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == user_id
-        )
-    ).first()
-    
-    if not member:
+    if user_id not in get_group_member_ids(db, group_id):
         return False, f"User {user_id} is not a member of group {group_id}"
     
     return True, None
@@ -38,15 +55,13 @@ def validate_users_in_group(
     to_user: uuid.UUID
 ) -> tuple[bool, Optional[str]]:
     """Validate that both users are in the group. Returns (is_valid, error_message)."""
-    # Validate from_user
-    is_valid, error_message = validate_user_in_group(db, group_id, from_user)
-    if not is_valid:
-        return False, error_message
+    # Both checks are answered from one lookup of the group's members
+    members = get_group_member_ids(db, group_id)
     
-    # Validate to_user
-    is_valid, error_message = validate_user_in_group(db, group_id, to_user)
-    if not is_valid:
-        return False, error_message
+    # Report from_user first, as before
+    for user_id in (from_user, to_user):
+        if user_id not in members:
+            return False, f"User {user_id} is not a member of group {group_id}"
     
     return True, None
 
@@ -69,17 +84,23 @@ def create_invoice(
         status="pending"
     )
     db.add(invoice)
-    db.commit()
-    db.refresh(invoice)
+    db.flush()  # Write the invoice row first so its items can reference it, without committing
     
-    # Create invoice items
-    for item_data in invoice_data.invoice_items:
-        invoice_item = InvoiceItem(
-            invoice_id=invoice.id,
-            item_assignment_id=item_data.item_assignment_id
+    # Create invoice items with a single executemany INSERT
+    if invoice_data.invoice_items:
+        db.exec(
+            insert(InvoiceItem),
+            params=[
+                {
+                    "id": uuid.uuid4(),
+                    "invoice_id": invoice.id,
+                    "item_assignment_id": item_data.item_assignment_id
+                }
+                for item_data in invoice_data.invoice_items
+            ]
         )
-        db.add(invoice_item)
     
+    # Single commit: the invoice never exists without its items
     db.commit()
     db.refresh(invoice)
     
@@ -94,14 +115,37 @@ def get_invoice_by_id(
     return db.get(Invoice, invoice_id)
 
 
+def _paginate(db: Session, query, limit: int, cursor: Optional[uuid.UUID]):
+    """
+    Apply keyset pagination, newest first on (created_at, id), capped at MAX_PAGE_SIZE rows.
+    A page holds the invoices after the cursor, the last invoice id of the previous page.
+    Raises ValueError if the cursor is not an invoice id.
+    """
+    query = query.order_by(Invoice.created_at.desc(), Invoice.id.desc())
+    if cursor:
+        cursor_created_at = db.exec(
+            select(Invoice.created_at).where(Invoice.id == cursor)
+        ).first()
+        if cursor_created_at is None:
+            raise ValueError("Unknown cursor")
+        query = query.where(
+            (Invoice.created_at < cursor_created_at)
+            | ((Invoice.created_at == cursor_created_at) & (Invoice.id < cursor))
+        )
+    return query.limit(min(limit, MAX_PAGE_SIZE))
+
+
 def list_invoices(
     db: Session,
     user_id: Optional[uuid.UUID] = None,
     status: Optional[str] = None,
-    group_id: Optional[uuid.UUID] = None
+    group_id: Optional[uuid.UUID] = None,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[uuid.UUID] = None,
+    columns: Optional[tuple] = None
 ) -> list[Invoice]:
-    """List invoices with optional filters."""
-    query = select(Invoice)
+    """List invoices with optional filters, paginated by limit and cursor. With columns, returns rows of just those columns."""
+    query = select(*columns) if columns else select(Invoice)
     
     if group_id:
         query = query.where(Invoice.group_id == group_id)
@@ -115,7 +159,7 @@ def list_invoices(
             (Invoice.from_user == user_id) | (Invoice.to_user == user_id)
         )
     
-    return db.exec(query).all()
+    return db.exec(_paginate(db, query, limit, cursor)).all()
 
 
 def update_invoice(
@@ -148,47 +192,41 @@ def mark_invoice_paid(
     paid_at: Optional[datetime] = None
 ) -> Invoice | None:
     """Mark invoice as paid and create wallet transactions."""
-    from crud.wallets import get_or_create_wallet, create_wallet_transaction
+    from crud.wallets import apply_wallet_transactions
     
-    invoice = db.get(Invoice, invoice_id)
+    # Mark as paid; RETURNING hands back the row, so there is no separate lookup
+    invoice = db.exec(
+        update(Invoice)
+        .where(Invoice.id == invoice_id)
+        .values(status="paid", paid_at=paid_at or datetime.now())
+        .returning(Invoice),
+        execution_options={"populate_existing": True}
+    ).scalar_one_or_none()
     if not invoice:
         return None
     
-    # Mark as paid
-    invoice.status = "paid"
-    invoice.paid_at = paid_at or datetime.now()
-    db.add(invoice)
-    db.flush()  # Flush to get invoice.id without committing
-    
-    # Get or create wallets for both users (without committing)
-    from_wallet = get_or_create_wallet(db, invoice.from_user, commit=False)
-    to_wallet = get_or_create_wallet(db, invoice.to_user, commit=False)
-    
-    # Create transaction for from_user (payment sent - negative amount)
-    create_wallet_transaction(
-        db=db,
-        wallet_id=from_wallet.id,
-        transaction_type="payment_sent",
-        amount=-invoice.total_amount,  # Negative because money goes out
-        invoice_id=invoice.id,
-        currency=invoice.currency,
-        description=f"Payment to user {invoice.to_user}",
-        commit=False
-    )
-    
-    # Create transaction for to_user (payment received - positive amount)
-    create_wallet_transaction(
-        db=db,
-        wallet_id=to_wallet.id,
-        transaction_type="payment_received",
-        amount=invoice.total_amount,  # Positive because money comes in
-        invoice_id=invoice.id,
-        currency=invoice.currency,
-        description=f"Payment from user {invoice.from_user}",
-        commit=False
-    )
+    # Wallet upsert and both transactions in two more statements, all in one commit
+    apply_wallet_transactions(db, [
+        {
+            # Payment sent - negative because money goes out
+            "user_id": invoice.from_user,
+            "type": "payment_sent",
+            "amount": -invoice.total_amount,
+            "invoice_id": invoice.id,
+            "currency": invoice.currency,
+            "description": f"Payment to user {invoice.to_user}"
+        },
+        {
+            # Payment received - positive because money comes in
+            "user_id": invoice.to_user,
+            "type": "payment_received",
+            "amount": invoice.total_amount,
+            "invoice_id": invoice.id,
+            "currency": invoice.currency,
+            "description": f"Payment from user {invoice.from_user}"
+        }
+    ])
     
-    # Single commit for all operations
     db.commit()
     db.refresh(invoice)
     
@@ -197,20 +235,30 @@ def mark_invoice_paid(
 
 def get_user_invoices(
     db: Session,
-    user_id: uuid.UUID
+    user_id: uuid.UUID,
+    status: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[uuid.UUID] = None,
+    columns: Optional[tuple] = None
 ) -> list[Invoice]:
-    """Get all invoices for a user (as from_user or to_user)."""
-    query = select(Invoice).where(
+    """Get all invoices for a user (as from_user or to_user), optionally filtered by status and paginated. With columns, returns rows of just those columns."""
+    query = (select(*columns) if columns else select(Invoice)).where(
         (Invoice.from_user == user_id) | (Invoice.to_user == user_id)
     )
-    return db.exec(query).all()
+    
+    if status:
+        query = query.where(Invoice.status == status)
+    
+    return db.exec(_paginate(db, query, limit, cursor)).all()
 
 
 def get_user_pending_invoices(
     db: Session,
-    user_id: uuid.UUID
+    user_id: uuid.UUID,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[uuid.UUID] = None,
+    columns: Optional[tuple] = None
 ) -> list[Invoice]:
     """Get pending invoices for a user."""
-    invoices = get_user_invoices(db, user_id)
-    return [inv for inv in invoices if inv.status == "pending"]
+    return get_user_invoices(db, user_id, status="pending", limit=limit, cursor=cursor, columns=columns)
 
@@ -1,7 +1,9 @@
 import uuid
+from sqlalchemy import exists, func, update
 from sqlmodel import select, Session
 from models.item_assignments import ItemAssignment
 from models.order_items import OrderItem
+from models.table_participants import TableParticipant
 
 
 def get_assignments_by_session_id(
@@ -17,6 +19,64 @@ def get_assignments_by_session_id(
     return assignments
 
 
+def get_summary_by_session_id(
+    db: Session,
+    session_id: uuid.UUID
+) -> dict[uuid.UUID, int]:
+    """Get the total assigned amount per creditor for a session."""
+    rows = db.exec(
+        select(ItemAssignment.creditor_id, func.sum(ItemAssignment.assigned_amount))
+        .join(OrderItem, OrderItem.id == ItemAssignment.order_item_id)
+        .where(OrderItem.session_id == session_id)
+        .group_by(ItemAssignment.creditor_id)
+    ).all()
+    return {creditor_id: total for creditor_id, total in rows}
+
+
+def get_assigned_total_by_session_id(
+    db: Session,
+    session_id: uuid.UUID
+) -> int:
+    """Get the total assigned amount for a session."""
+    total = db.exec(
+        select(func.coalesce(func.sum(ItemAssignment.assigned_amount), 0))
+        .join(OrderItem, OrderItem.id == ItemAssignment.order_item_id)
+        .where(OrderItem.session_id == session_id)
+    ).one()
+    return total
+
+
+def get_validation_stats(
+    db: Session,
+    session_id: uuid.UUID
+) -> tuple[list[uuid.UUID], bool]:
+    """
+    Get the IDs of order items without assignments and whether the session is fully assigned.
+    A session is fully assigned when every item has an assignment and the assigned total covers the items total.
+    """
+    unassigned_item_ids = db.exec(
+        select(OrderItem.id).where(
+            OrderItem.session_id == session_id,
+            ~exists().where(ItemAssignment.order_item_id == OrderItem.id)
+        )
+    ).all()
+
+    total_items = (
+        select(func.coalesce(func.sum(OrderItem.unit_price), 0))
+        .where(OrderItem.session_id == session_id)
+        .scalar_subquery()
+    )
+    total_assigned = (
+        select(func.coalesce(func.sum(ItemAssignment.assigned_amount), 0))
+        .join(OrderItem, OrderItem.id == ItemAssignment.order_item_id)
+        .where(OrderItem.session_id == session_id)
+        .scalar_subquery()
+    )
+    covered = db.exec(select(total_assigned >= total_items)).one()
+
+    return list(unassigned_item_ids), not unassigned_item_ids and bool(covered)
+
+
 def get_assignment_by_id(
     db: Session,
     assignment_id: uuid.UUID
@@ -24,6 +84,39 @@ def get_assignment_by_id(
     """Get an item assignment by its ID."""
     return db.get(ItemAssignment, assignment_id)
 
+
+def get_assignment_with_session_id(
+    db: Session,
+    assignment_id: uuid.UUID
+) -> tuple[ItemAssignment | None, uuid.UUID | None]:
+    """Get an item assignment and the session_id of its order item in one query."""
+    row = db.exec(
+        select(ItemAssignment, OrderItem.session_id)
+        .join(OrderItem, OrderItem.id == ItemAssignment.order_item_id)
+        .where(ItemAssignment.id == assignment_id)
+    ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def get_assignment_target_session_ids(
+    db: Session,
+    order_item_id: uuid.UUID,
+    creditor_id: uuid.UUID,
+    debtor_id: uuid.UUID | None = None
+) -> tuple[uuid.UUID | None, uuid.UUID | None, uuid.UUID | None]:
+    """
+    Get the session_id of an order item, its creditor and its debtor in one query.
+    Each is None if the row doesn't exist (or no debtor was given).
+    """
+    row = db.exec(
+        select(
+            select(OrderItem.session_id).where(OrderItem.id == order_item_id).scalar_subquery(),
+            select(TableParticipant.session_id).where(TableParticipant.id == creditor_id).scalar_subquery(),
+            select(TableParticipant.session_id).where(TableParticipant.id == debtor_id).scalar_subquery()
+        )
+    ).one()
+    return tuple(row)
+
 def get_assignments_by_order_item_id(
     db: Session,
     order_item_id: uuid.UUID
@@ -40,7 +133,8 @@ def create_assignment(
     order_item_id: uuid.UUID,
     creditor_id: uuid.UUID,
     debtor_id: uuid.UUID | None = None,
-    assigned_amount: int = 0
+    assigned_amount: int = 0,
+    commit: bool = True
 ) -> ItemAssignment:
     """Create a new item assignment."""
     assignment = ItemAssignment(
@@ -50,31 +144,37 @@ def create_assignment(
         assigned_amount=assigned_amount
     )
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    if commit:
+        db.commit()
+        db.refresh(assignment)
+    else:
+        db.flush()
     return assignment
 
 
-def update_assignment(
+def bulk_update_assignments_for_item(
     db: Session,
-    assignment_id: uuid.UUID,
-    assigned_amount: int
-) -> ItemAssignment:
-    """Update an item assignment's assigned amount."""
-    assignment = db.get(ItemAssignment, assignment_id)
-    if not assignment:
-        raise ValueError("Assignment not found")
-    
-    assignment.assigned_amount = assigned_amount
-    db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
-    return assignment
+    order_item_id: uuid.UUID,
+    assigned_amount: int,
+    commit: bool = True
+) -> list[uuid.UUID]:
+    """Set the assigned amount of every assignment on an order item in one UPDATE. Returns the updated IDs."""
+    result = db.execute(
+        update(ItemAssignment)
+        .where(ItemAssignment.order_item_id == order_item_id)
+        .values(assigned_amount=assigned_amount)
+        .returning(ItemAssignment.id)
+    )
+    assignment_ids = list(result.scalars().all())
+    if commit:
+        db.commit()
+    return assignment_ids
 
 
 def delete_assignment(
     db: Session,
-    assignment_id: uuid.UUID
+    assignment_id: uuid.UUID,
+    commit: bool = True
 ) -> None:
     """Delete an item assignment."""
     assignment = db.get(ItemAssignment, assignment_id)
@@ -82,5 +182,8 @@ def delete_assignment(
         raise ValueError("Assignment not found")
     
     db.delete(assignment)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
 
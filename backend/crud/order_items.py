@@ -1,6 +1,9 @@
 import uuid
+from collections.abc import Iterator
+from sqlalchemy import RowMapping
 from sqlmodel import select, Session
 from models.order_items import OrderItem
+from models.item_assignments import ItemAssignment
 
 
 def get_order_items_by_session_id(
@@ -14,6 +17,32 @@ def get_order_items_by_session_id(
     return order_items
 
 
+def get_order_item_rows_with_assignments(
+    db: Session,
+    session_id: uuid.UUID
+) -> Iterator[RowMapping]:
+    """
+    Get all order items for a session joined with their assignments, as plain rows in one query.
+    Items without assignments come back once with null assignment columns.
+    Rows are streamed in batches, so consume them before issuing another query.
+    """
+    return db.exec(
+        select(
+            OrderItem.id,
+            OrderItem.item_name,
+            OrderItem.unit_price,
+            OrderItem.ordered_at,
+            ItemAssignment.id.label("assignment_id"),
+            ItemAssignment.creditor_id,
+            ItemAssignment.debtor_id,
+            ItemAssignment.assigned_amount
+        )
+        .outerjoin(ItemAssignment, ItemAssignment.order_item_id == OrderItem.id)
+        .where(OrderItem.session_id == session_id)
+        .execution_options(yield_per=1000)
+    ).mappings()
+
+
 def get_order_item_by_id(
     db: Session,
     order_item_id: uuid.UUID
@@ -1,6 +1,12 @@
 import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from sqlalchemy import RowMapping, insert
 from sqlmodel import select, Session
 from models.table_participants import TableParticipant
+from models.item_assignments import ItemAssignment
+from models.users import User
+from core.config import settings
 
 
 def get_participants_by_session_id(
@@ -14,6 +20,28 @@ def get_participants_by_session_id(
     return participants
 
 
+def get_participant_rows_with_users(
+    db: Session,
+    session_id: uuid.UUID
+) -> Iterator[RowMapping]:
+    """
+    Get all participants for a session with their user's name and avatar, as plain rows in one query.
+    Rows are streamed in batches, so consume them before issuing another query.
+    """
+    return db.exec(
+        select(
+            TableParticipant.id,
+            TableParticipant.user_id,
+            TableParticipant.joined_at,
+            User.name.label("user_name"),
+            User.avatar_url.label("user_avatar_url")
+        )
+        .outerjoin(User, User.id == TableParticipant.user_id)
+        .where(TableParticipant.session_id == session_id)
+        .execution_options(yield_per=1000)
+    ).mappings()
+
+
 def get_participant_by_session_and_user(
     db: Session,
     session_id: uuid.UUID,
@@ -29,6 +57,20 @@ def get_participant_by_session_and_user(
     return participant
 
 
+def get_participant_id_by_session_and_user(
+    db: Session,
+    session_id: uuid.UUID,
+    user_id: uuid.UUID
+) -> uuid.UUID | None:
+    """Get the id of a participant by session_id and user_id, without loading the row."""
+    return db.exec(
+        select(TableParticipant.id).where(
+            TableParticipant.session_id == session_id,
+            TableParticipant.user_id == user_id
+        )
+    ).first()
+
+
 def get_participant_by_id(
     db: Session,
     participant_id: uuid.UUID
@@ -37,18 +79,65 @@ def get_participant_by_id(
     return db.get(TableParticipant, participant_id)
 
 
-def create_participant(
+def get_participants_by_ids(
+    db: Session,
+    participant_ids: set[uuid.UUID] | list[uuid.UUID]
+) -> list[TableParticipant]:
+    """Get participants by their IDs in a single query."""
+    if not participant_ids:
+        return []
+    participants = db.exec(
+        select(TableParticipant).where(TableParticipant.id.in_(participant_ids))
+    ).all()
+    return participants
+
+
+def get_selectable_user_ids(
     db: Session,
     session_id: uuid.UUID,
-    user_id: uuid.UUID | None = None
-) -> TableParticipant:
-    """Create a new participant for a session."""
-    participant = TableParticipant(
-        session_id=session_id,
-        user_id=user_id
+    order_item_id: uuid.UUID,
+    current_participant_id: uuid.UUID | None = None
+) -> list[uuid.UUID]:
+    """Get user_ids of session participants not yet assigned (as creditor or debtor) to an order item."""
+    creditor_ids = select(ItemAssignment.creditor_id).where(
+        ItemAssignment.order_item_id == order_item_id
+    )
+    debtor_ids = select(ItemAssignment.debtor_id).where(
+        ItemAssignment.order_item_id == order_item_id,
+        ItemAssignment.debtor_id.is_not(None)
     )
-    db.add(participant)
-    db.commit()
-    db.refresh(participant)
+    statement = select(TableParticipant.user_id).where(
+        TableParticipant.session_id == session_id,
+        TableParticipant.user_id.is_not(None),
+        TableParticipant.id.not_in(creditor_ids),
+        TableParticipant.id.not_in(debtor_ids)
+    )
+    if current_participant_id:
+        statement = statement.where(TableParticipant.id != current_participant_id)
+    return db.exec(statement).all()
+
+
+def insert_participant(
+    db: Session,
+    session_id: uuid.UUID,
+    user_id: uuid.UUID | None = None,
+    commit: bool = True
+) -> RowMapping:
+    """
+    Create a new participant with a single INSERT ... RETURNING.
+    Returns the stored id, user_id and joined_at without loading or refreshing an ORM instance.
+    """
+    participant = db.exec(
+        insert(TableParticipant)
+        .values(
+            id=uuid.uuid4(),
+            session_id=session_id,
+            user_id=user_id,
+            joined_at=datetime.now(settings.APP_TIMEZONE)
+        )
+        .returning(TableParticipant.id, TableParticipant.user_id, TableParticipant.joined_at)
+    ).mappings().one()
+    if commit:
+        db.commit()
     return participant
 
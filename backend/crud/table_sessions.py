@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from sqlalchemy import func, update
 from sqlmodel import select, Session
 from models.table_sessions import TableSession
 from models.order_items import OrderItem
@@ -46,6 +47,26 @@ def get_session_by_id(
     return db.get(TableSession, session_id)
 
 
+def get_session_version(
+    db: Session,
+    session_id: uuid.UUID
+) -> int | None:
+    """Get a session's current state version."""
+    return db.exec(
+        select(TableSession.version).where(TableSession.id == session_id)
+    ).first()
+
+
+def is_session_locked(
+    db: Session,
+    session_id: uuid.UUID
+) -> bool:
+    """Check whether a session is locked against assignment changes."""
+    return bool(db.exec(
+        select(TableSession.locked).where(TableSession.id == session_id)
+    ).first())
+
+
 def get_session_items(
     db: Session,
     session_id: uuid.UUID
@@ -68,6 +89,24 @@ def get_session_participants(
     return participants
 
 
+def get_equal_split_stats(
+    db: Session,
+    session_id: uuid.UUID
+) -> tuple[int, int]:
+    """Get a session's order items total and participant count, aggregated in one query."""
+    items_total, participant_count = db.exec(
+        select(
+            select(func.coalesce(func.sum(OrderItem.unit_price), 0))
+            .where(OrderItem.session_id == session_id)
+            .scalar_subquery(),
+            select(func.count(TableParticipant.id))
+            .where(TableParticipant.session_id == session_id)
+            .scalar_subquery()
+        )
+    ).one()
+    return items_total, participant_count
+
+
 def close_session(
     db: Session,
     session_id: uuid.UUID,
@@ -82,8 +121,42 @@ def close_session(
     session.session_end = datetime.now()
     
     db.add(session)
-    db.commit()
+    bump_session_version(db, session_id)
     db.refresh(session)
     
     return session
 
+
+
+def bump_session_version(
+    db: Session,
+    session_id: uuid.UUID,
+    commit: bool = True
+) -> int | None:
+    """Increment a session's state version with a single atomic UPDATE. Returns the new version."""
+    version = db.exec(
+        update(TableSession)
+        .where(TableSession.id == session_id)
+        .values(version=TableSession.version + 1)
+        .returning(TableSession.version)
+    ).scalar_one_or_none()
+    if commit:
+        db.commit()
+    return version
+
+
+def bump_user_session_versions(
+    db: Session,
+    user_id: uuid.UUID,
+    commit: bool = True
+) -> None:
+    """Increment the state version of every session the user participates in, e.g. after a profile change."""
+    db.exec(
+        update(TableSession)
+        .where(TableSession.id.in_(
+            select(TableParticipant.session_id).where(TableParticipant.user_id == user_id)
+        ))
+        .values(version=TableSession.version + 1)
+    )
+    if commit:
+        db.commit()
@@ -1,24 +1,100 @@
 import uuid
+from datetime import datetime
 from typing import Optional
+from sqlalchemy import insert as sa_insert, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import select, Session
 from models.wallets import Wallet
 from models.wallet_transactions import WalletTransaction
+from schemas.wallets import WalletTransactionResponse
+from core.config import settings
+
+# Columns read by WalletTransactionResponse; list endpoints select just these as plain rows instead of ORM objects
+TRANSACTION_RESPONSE_COLUMNS = tuple(getattr(WalletTransaction, name) for name in WalletTransactionResponse.model_fields)
 
 
 def get_or_create_wallet(db: Session, user_id: uuid.UUID, commit: bool = True) -> Wallet:
     """Get wallet for user, create if it doesn't exist."""
+    # Plain read first: reads of an existing wallet never take SQLite's write lock
     wallet = db.exec(select(Wallet).where(Wallet.user_id == user_id)).first()
-    if not wallet:
-        wallet = Wallet(user_id=user_id, balance=0, currency="CLP")
-        db.add(wallet)
-        if commit:
-            db.commit()
-            db.refresh(wallet)
-        else:
-            db.flush()
+    if wallet:
+        return wallet
+    
+    now = datetime.now(settings.APP_TIMEZONE)
+    stmt = insert(Wallet).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        balance=0,
+        currency="CLP",
+        created_at=now,
+        updated_at=now
+    )
+    # Missing: insert it, with a no-op update on conflict so a wallet created concurrently is returned instead
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Wallet.user_id],
+        set_={"user_id": stmt.excluded.user_id}
+    ).returning(Wallet)
+    wallet = db.exec(stmt, execution_options={"populate_existing": True}).scalar_one()
+    if commit:
+        db.commit()
     return wallet
 
 
+def apply_wallet_transactions(
+    db: Session,
+    transactions: list[dict]
+) -> None:
+    """
+    Record transactions for several users in two statements; the caller commits.
+    Each dict holds user_id, type and amount, and optionally invoice_id, currency and description.
+    """
+    now = datetime.now(settings.APP_TIMEZONE)
+    
+    # Net balance change per user
+    deltas: dict[uuid.UUID, int] = {}
+    for transaction in transactions:
+        deltas[transaction["user_id"]] = deltas.get(transaction["user_id"], 0) + transaction["amount"]
+    
+    # One upsert creates missing wallets (starting at the delta) and moves existing balances atomically
+    stmt = insert(Wallet).values([
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "balance": delta,
+            "currency": "CLP",
+            "created_at": now,
+            "updated_at": now
+        }
+        for user_id, delta in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Wallet.user_id],
+        set_={
+            "balance": Wallet.balance + stmt.excluded.balance,
+            "updated_at": stmt.excluded.updated_at
+        }
+    ).returning(Wallet.user_id, Wallet.id)
+    wallet_ids = {row.user_id: row.id for row in db.exec(stmt)}
+    
+    # One executemany INSERT for the transaction rows
+    db.exec(
+        sa_insert(WalletTransaction),
+        params=[
+            {
+                "id": uuid.uuid4(),
+                "wallet_id": wallet_ids[transaction["user_id"]],
+                "invoice_id": transaction.get("invoice_id"),
+                "type": transaction["type"],
+                "amount": transaction["amount"],
+                "currency": transaction.get("currency", "CLP"),
+                "description": transaction.get("description"),
+                "created_at": now
+            }
+            for transaction in transactions
+        ]
+    )
+
+
 def get_wallet_by_user_id(db: Session, user_id: uuid.UUID) -> Optional[Wallet]:
     """Get wallet by user ID."""
     return db.exec(select(Wallet).where(Wallet.user_id == user_id)).first()
@@ -44,9 +120,31 @@ def create_wallet_transaction(
     if not wallet:
         raise ValueError(f"Wallet {wallet_id} not found")
     
+    transaction = add_wallet_transaction(db, wallet, transaction_type, amount, invoice_id, currency, description)
+    
+    if commit:
+        db.commit()
+        db.refresh(transaction)
+        db.refresh(wallet)
+    else:
+        db.flush()
+    
+    return transaction
+
+
+def add_wallet_transaction(
+    db: Session,
+    wallet: Wallet,
+    transaction_type: str,
+    amount: int,
+    invoice_id: Optional[uuid.UUID] = None,
+    currency: str = "CLP",
+    description: Optional[str] = None
+) -> WalletTransaction:
+    """Stage a transaction and balance change on an already-loaded wallet; the caller flushes or commits."""
     # Create transaction
     transaction = WalletTransaction(
-        wallet_id=wallet_id,
+        wallet_id=wallet.id,
         invoice_id=invoice_id,
         type=transaction_type,
         amount=amount,
@@ -55,16 +153,12 @@ def create_wallet_transaction(
     )
     db.add(transaction)
     
-    # Update wallet balance
-    wallet.balance += amount
-    db.add(wallet)
-    
-    if commit:
-        db.commit()
-        db.refresh(transaction)
-        db.refresh(wallet)
-    else:
-        db.flush()
+    # Update wallet balance atomically in SQL instead of read-modify-write; the loaded wallet is kept in sync
+    db.exec(
+        update(Wallet)
+        .where(Wallet.id == wallet.id)
+        .values(balance=Wallet.balance + amount)
+    )
     
     return transaction
 
@@ -73,20 +167,17 @@ def get_wallet_transactions(
     db: Session,
     wallet_id: Optional[uuid.UUID] = None,
     user_id: Optional[uuid.UUID] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    columns: Optional[tuple] = None
 ) -> list[WalletTransaction]:
-    """Get wallet transactions with optional filters."""
-    query = select(WalletTransaction)
+    """Get wallet transactions with optional filters. With columns, returns rows of just those columns."""
+    query = select(*columns) if columns else select(WalletTransaction)
     
     if wallet_id:
         query = query.where(WalletTransaction.wallet_id == wallet_id)
     elif user_id:
-        # Get wallet for user and filter by wallet_id
-        wallet = get_wallet_by_user_id(db, user_id)
-        if wallet:
-            query = query.where(WalletTransaction.wallet_id == wallet.id)
-        else:
-            return []
+        # Filter through the user's wallet in the same query; no wallet means no rows
+        query = query.join(Wallet, Wallet.id == WalletTransaction.wallet_id).where(Wallet.user_id == user_id)
     
     query = query.order_by(WalletTransaction.created_at.desc())
     
@@ -102,13 +193,23 @@ def get_wallet_with_transactions(
     limit: Optional[int] = None
 ) -> Optional[Wallet]:
     """Get wallet with recent transactions."""
-    wallet = get_wallet_by_user_id(db, user_id)
-    if not wallet:
+    # Wallet and its newest transactions in one query; user_id is unique, so every row carries the same wallet
+    query = (
+        select(Wallet, WalletTransaction)
+        .outerjoin(WalletTransaction, WalletTransaction.wallet_id == Wallet.id)
+        .where(Wallet.user_id == user_id)
+        .order_by(WalletTransaction.created_at.desc())
+    )
+    
+    if limit:
+        query = query.limit(limit)
+    
+    rows = db.exec(query).all()
+    if not rows:
         return None
     
-    # Get transactions
-    transactions = get_wallet_transactions(db, wallet_id=wallet.id, limit=limit)
-    wallet.transactions = transactions
+    wallet = rows[0][0]
+    wallet.transactions = [transaction for _, transaction in rows if transaction is not None]
     
     return wallet
 
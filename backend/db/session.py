@@ -1,11 +1,38 @@
 from typing import Generator
 
 from sqlmodel import Session, create_engine
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
 
 from core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI) # type: ignore
+# Sessions are used from worker threads (asyncio.to_thread), so connections can't be pinned to their creating thread
+# No pre-ping or recycle: a local SQLite file has no server to drop idle connections
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI, # type: ignore
+    connect_args={
+        "check_same_thread": False,
+        "cached_statements": settings.DB_STATEMENT_CACHE_SIZE
+    },
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    """
+    Tune every new SQLite connection for a write-heavy workload.
+    WAL makes a commit an append to the log, and synchronous=NORMAL only fsyncs at checkpoints instead of per commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.close()
 
 SessionLocal = sessionmaker(bind=engine, class_=Session, autocommit=False, autoflush=False)
 
@@ -1,19 +1,32 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import configure_mappers
 
+import models  # Registers every table model before configure_mappers() runs
 from core.config import settings
 from starlette.middleware.sessions import SessionMiddleware
 from api.routers import v1_router
+from api.websocket.manager import manager
 
 
-app = FastAPI(title="YoPagoCL API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resolve every model relationship now rather than on the first request's first query
+    configure_mappers()
+    await manager.start()
+    yield
+    await manager.stop()
+
+
+app = FastAPI(title="YoPagoCL API", version="0.1.0", lifespan=lifespan)
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=settings.LOG_LEVEL.upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, func, UniqueConstraint
+from sqlalchemy import Column, DateTime, func, Index, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 from typing import TYPE_CHECKING
 
@@ -26,9 +26,10 @@ class GroupMember(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
 
-    # Unique constraint on (group_id, user_id)
+    # Unique constraint on (group_id, user_id); the reverse index serves "groups of a user" lookups
     __table_args__ = (
         UniqueConstraint("group_id", "user_id", name="uq_group_members_group_user"),
+        Index("ix_group_members_user_group", "user_id", "group_id"),
     )
 
     # Relationships
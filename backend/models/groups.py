@@ -20,7 +20,7 @@ class Group(SQLModel, table=True):
         sa_column_kwargs={"nullable": False}
     )
     name: str = Field(max_length=100, nullable=False)
-    slug: str = Field(max_length=12, nullable=False)
+    slug: str = Field(max_length=12, unique=True, index=True, nullable=False)
     description: str | None = Field(default=None, nullable=True)
     currency: str = Field(default="CLP", max_length=3, nullable=False)
     created_at: datetime = Field(
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, date
 from sqlalchemy import Column, DateTime, func
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import TYPE_CHECKING, Optional
 
 from core.config import settings
@@ -43,6 +43,15 @@ class Invoice(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     )
 
+    # Indexes for the list filters; one per user column so "from_user OR to_user" becomes an index union,
+    # each also narrowing by status (pending invoices, paid invoices of a session)
+    __table_args__ = (
+        Index("idx_invoices_group_status", "group_id", "status"),
+        Index("idx_invoices_from_user_status", "from_user", "status"),
+        Index("idx_invoices_to_user_status", "to_user", "status"),
+        Index("idx_invoices_session_status", "session_id", "status"),
+    )
+
     # Relationships
     session: "TableSession" = Relationship(back_populates="invoices")
     group: Optional["Group"] = Relationship()
@@ -1,6 +1,5 @@
 import uuid
-from sqlalchemy import UniqueConstraint
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
@@ -22,6 +21,11 @@ class ItemAssignment(SQLModel, table=True):
     debtor_id: Optional[uuid.UUID] = Field(foreign_key="table_participants.id", default=None, nullable=True)
     assigned_amount: int = Field(nullable=False)
 
+    # Covers the per-item creditor/debtor lookups used by the session WebSocket
+    __table_args__ = (
+        Index("idx_item_assignments_item_creditor_debtor", "order_item_id", "creditor_id", "debtor_id"),
+    )
+
     # Relationships
     order_item: "OrderItem" = Relationship(back_populates="assignments")
     creditor: "TableParticipant" = Relationship(
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, DateTime, func
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import TYPE_CHECKING
 
 from core.config import settings
@@ -27,6 +27,11 @@ class OrderItem(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
 
+    # Every per-session read (state, assignments, summaries) filters on session_id
+    __table_args__ = (
+        Index("idx_order_items_session", "session_id"),
+    )
+
     # Relationships
     session: "TableSession" = Relationship(back_populates="order_items")
     assignments: list["ItemAssignment"] = Relationship(back_populates="order_item")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, DateTime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -22,6 +22,11 @@ class PaymentReminder(SQLModel, table=True):
     near_to_due_date: bool = Field(default=False, nullable=False)
     status: str = Field(default="pending", max_length=20, nullable=False)  # pending, sent, cancelled
 
+    # Reminders are always looked up per invoice, optionally by status
+    __table_args__ = (
+        Index("idx_payment_reminders_invoice_status", "invoice_id", "status"),
+    )
+
     # Relationships
     invoice: "Invoice" = Relationship(back_populates="payment_reminders")
 
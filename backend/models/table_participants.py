@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, DateTime, func
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import TYPE_CHECKING, Optional
 
 from core.config import settings
@@ -14,6 +14,9 @@ if TYPE_CHECKING:
 
 class TableParticipant(SQLModel, table=True):
     __tablename__ = "table_participants"
+    __table_args__ = (
+        Index("idx_table_participants_session_user", "session_id", "user_id", unique=True),
+    )
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
@@ -34,6 +34,7 @@ class TableSession(SQLModel, table=True):
     currency: str = Field(default="CLP", max_length=3, nullable=False)
     locked: bool = Field(default=False, nullable=False)  # Whether assignments are locked
     locked_by_user_id: uuid.UUID | None = Field(default=None, nullable=True)  # User who locked the session
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"}, nullable=False)  # Bumped on every state change
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(settings.APP_TIMEZONE),
         sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, DateTime, func
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import TYPE_CHECKING, Optional
 
 from core.config import settings
@@ -30,6 +30,11 @@ class WalletTransaction(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
 
+    # Serves a wallet's history ordered by created_at (scanned backwards for newest first)
+    __table_args__ = (
+        Index("idx_wallet_transactions_wallet_created", "wallet_id", "created_at"),
+    )
+
     # Relationships
     wallet: "Wallet" = Relationship(back_populates="transactions")
     invoice: Optional["Invoice"] = Relationship(back_populates="wallet_transactions")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 
 
@@ -8,13 +8,6 @@ class AuthorizationUrlResponse(BaseModel):
     state: str
 
 
-class TokenResponse(BaseModel):
-    """Response with access token and user info."""
-    access_token: str
-    token_type: str = "bearer"
-    user: "UserResponse"
-
-
 class UserResponse(BaseModel):
     """User information response."""
     id: UUID
@@ -23,8 +16,14 @@ class UserResponse(BaseModel):
     phone: str | None = None
     avatar_url: str | None = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TokenResponse(BaseModel):
+    """Response with access token and user info."""
+    access_token: str
+    token_type: str = "bearer"
+    user: UserResponse
 
 
 class LoginCallbackRequest(BaseModel):
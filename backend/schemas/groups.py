@@ -1,7 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 # Import at runtime for forward reference resolution
 from schemas.auth import UserResponse
@@ -9,13 +8,13 @@ from schemas.auth import UserResponse
 
 class GroupCreate(BaseModel):
     name: str = Field(..., max_length=100)
-    description: Optional[str] = None
+    description: str | None = None
     currency: str = Field(default="CLP", max_length=3)
 
 
 class GroupUpdate(BaseModel):
-    name: Optional[str] = Field(None, max_length=100)
-    description: Optional[str] = None
+    name: str | None = Field(None, max_length=100)
+    description: str | None = None
 
 
 class GroupMemberAdd(BaseModel):
@@ -26,14 +25,13 @@ class GroupResponse(BaseModel):
     id: uuid.UUID
     name: str
     slug: str
-    description: Optional[str]
+    description: str | None
     currency: str
     created_at: datetime
     updated_at: datetime
     created_by: uuid.UUID
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class GroupMemberResponse(BaseModel):
@@ -41,8 +39,7 @@ class GroupMemberResponse(BaseModel):
     group_id: uuid.UUID
     user_id: uuid.UUID
     joined_at: datetime
-    user: Optional["UserResponse"] = None
+    user: "UserResponse | None" = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
@@ -1,7 +1,6 @@
 import uuid
 from datetime import date, datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class InvoiceItemCreate(BaseModel):
@@ -14,35 +13,34 @@ class InvoiceCreate(BaseModel):
     from_user: uuid.UUID  # User who pays
     to_user: uuid.UUID  # User who receives
     total_amount: int = Field(..., description="Amount in CLP")
-    description: Optional[str] = None
+    description: str | None = None
     currency: str = Field(default="CLP", max_length=3)
-    due_date: Optional[date] = None
+    due_date: date | None = None
     invoice_items: list[InvoiceItemCreate]
 
 
 class InvoiceUpdate(BaseModel):
-    status: Optional[str] = None
-    description: Optional[str] = None
-    due_date: Optional[date] = None
+    status: str | None = None
+    description: str | None = None
+    due_date: date | None = None
 
 
 class InvoiceResponse(BaseModel):
     id: uuid.UUID
     session_id: uuid.UUID
-    group_id: Optional[uuid.UUID]
+    group_id: uuid.UUID | None
     from_user: uuid.UUID
     to_user: uuid.UUID
     total_amount: int
-    description: Optional[str]
+    description: str | None
     created_at: datetime
     currency: str
     status: str
-    due_date: Optional[date]
-    paid_at: Optional[datetime]
+    due_date: date | None
+    paid_at: datetime | None
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AvailableGroupsResponse(BaseModel):
@@ -50,7 +48,7 @@ class AvailableGroupsResponse(BaseModel):
 
 
 class InvoiceMarkPaid(BaseModel):
-    paid_at: Optional[datetime] = None
+    paid_at: datetime | None = None
 
 
 class BillPaymentRequest(BaseModel):
@@ -63,5 +61,5 @@ class BillPaymentRequest(BaseModel):
 class BillPaymentResponse(BaseModel):
     payment_id: str
     invoices: list[InvoiceResponse]
-    transbank_token: Optional[str] = None
+    transbank_token: str | None = None
 
@@ -1,13 +1,12 @@
 import uuid
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class PaymentReminderCreate(BaseModel):
     invoice_id: uuid.UUID
     send_at: datetime
-    message: Optional[str] = None
+    message: str | None = None
     near_to_due_date: bool = Field(default=False)
 
 
@@ -15,10 +14,9 @@ class PaymentReminderResponse(BaseModel):
     id: uuid.UUID
     invoice_id: uuid.UUID
     send_at: datetime
-    message: Optional[str]
+    message: str | None
     near_to_due_date: bool
     status: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
@@ -1,21 +1,19 @@
 import uuid
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class SessionResponse(BaseModel):
     id: uuid.UUID
     restaurant_id: str
     table_id: uuid.UUID
     session_start: datetime
-    session_end: Optional[datetime]
+    session_end: datetime | None
     status: str
-    total_amount: Optional[int]
+    total_amount: int | None
     currency: str
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderItemCreate(BaseModel):
@@ -29,18 +27,16 @@ class OrderItemResponse(BaseModel):
     unit_price: int
     ordered_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TableParticipantResponse(BaseModel):
     id: uuid.UUID
     session_id: uuid.UUID
-    user_id: Optional[uuid.UUID]
+    user_id: uuid.UUID | None
     joined_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SessionCreate(BaseModel):
     restaurant_id: str
@@ -1,7 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class WalletResponse(BaseModel):
@@ -12,38 +11,35 @@ class WalletResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WalletTransactionResponse(BaseModel):
     id: uuid.UUID
     wallet_id: uuid.UUID
-    invoice_id: Optional[uuid.UUID]
+    invoice_id: uuid.UUID | None
     type: str
     amount: int
     currency: str
-    description: Optional[str]
+    description: str | None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WalletWithTransactionsResponse(WalletResponse):
     transactions: list[WalletTransactionResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WalletTransactionCreate(BaseModel):
     wallet_id: uuid.UUID
-    invoice_id: Optional[uuid.UUID] = None
+    invoice_id: uuid.UUID | None = None
     type: str = Field(..., description="payment_sent, payment_received, deposit, withdrawal")
     amount: int = Field(..., description="Amount in CLP")
     currency: str = Field(default="CLP", max_length=3)
-    description: Optional[str] = None
+    description: str | None = None
 
 
 class WalletTopUpRequest(BaseModel):
@@ -56,5 +52,5 @@ class WalletTopUpResponse(BaseModel):
     wallet_id: uuid.UUID
     amount: int
     balance: int
-    transbank_token: Optional[str] = None  # For Transbank integration
+    transbank_token: str | None = None  # For Transbank integration
 
@@ -1,4 +1,4 @@
-from typing import Optional, Literal
+from typing import Literal
 from pydantic import BaseModel
 import uuid
 
@@ -13,13 +13,14 @@ class WSMessage(BaseModel):
 class JoinSessionMessage(BaseModel):
     type: Literal["join_session"] = "join_session"
     user_id: uuid.UUID
+    last_version: int | None = None  # Session version from the client's last session_state
 
 
 class AssignItemMessage(BaseModel):
     type: Literal["assign_item"] = "assign_item"
     order_item_id: uuid.UUID
     creditor_id: uuid.UUID  # Participant who will pay
-    debtor_id: Optional[uuid.UUID] = None  # Participant who owes (if different)
+    debtor_id: uuid.UUID | None = None  # Participant who owes (if different)
     assigned_amount: int  # Amount in CLP
 
 
@@ -58,14 +59,15 @@ class UnlockSessionMessage(BaseModel):
     type: Literal["unlock_session"] = "unlock_session"
 
 
-# Outgoing messages
+# Outgoing messages: built from trusted server data with model_construct, so they skip validation
 class ParticipantJoinedMessage(BaseModel):
     type: Literal["participant_joined"] = "participant_joined"
     participant_id: uuid.UUID
-    user_id: Optional[uuid.UUID]
+    user_id: uuid.UUID | None
     joined_at: str
-    user_name: Optional[str] = None
-    user_avatar_url: Optional[str] = None
+    user_name: str | None = None
+    user_avatar_url: str | None = None
+    version: int  # Session version after this change; clients track it for the rejoin shortcut
 
 
 class ParticipantLeftMessage(BaseModel):
@@ -73,15 +75,6 @@ class ParticipantLeftMessage(BaseModel):
     participant_id: uuid.UUID
 
 
-class ItemAssignedMessage(BaseModel):
-    type: Literal["item_assigned"] = "item_assigned"
-    assignment_id: uuid.UUID
-    order_item_id: uuid.UUID
-    creditor_id: uuid.UUID
-    debtor_id: Optional[uuid.UUID]
-    assigned_amount: int
-
-
 class SelectableParticipantsMessage(BaseModel):
     type: Literal["selectable_participants"] = "selectable_participants"
     order_item_id: uuid.UUID
@@ -92,15 +85,12 @@ class PayingForParticipantsMessage(BaseModel):
     order_item_id: uuid.UUID
     paying_for_participants: list[str]  # List of user_ids that the current user is paying for
 
-class AssignmentUpdatedMessage(BaseModel):
-    type: Literal["assignment_updated"] = "assignment_updated"
-    assignment_id: uuid.UUID
-    assigned_amount: int
-
-
-class AssignmentRemovedMessage(BaseModel):
-    type: Literal["assignment_removed"] = "assignment_removed"
-    assignment_id: uuid.UUID
+class AssignmentsChangedMessage(BaseModel):
+    type: Literal["assignments_changed"] = "assignments_changed"
+    added: list[dict]  # New assignments, same shape as session_state assignments
+    updated: list[dict]  # {order_item_id, assigned_amount, assignment_ids} per rebalanced item
+    removed: list[uuid.UUID]
+    version: int
 
 
 class EqualSplitCalculatedMessage(BaseModel):
@@ -126,6 +116,7 @@ class SessionFinalizedMessage(BaseModel):
     session_id: uuid.UUID
     total_amount: int
     ready_for_invoices: bool
+    version: int
 
 
 class SessionStateMessage(BaseModel):
@@ -136,11 +127,20 @@ class SessionStateMessage(BaseModel):
     assignments: list[dict]
 
 
+class SessionSyncedMessage(BaseModel):
+    type: Literal["session_synced"] = "session_synced"
+    version: int
+    locked: bool
+    locked_by_user_id: uuid.UUID | None = None
+
+
 class SessionLockedMessage(BaseModel):
     type: Literal["session_locked"] = "session_locked"
     locked_by_user_id: uuid.UUID
+    version: int
 
 
 class SessionUnlockedMessage(BaseModel):
     type: Literal["session_unlocked"] = "session_unlocked"
+    version: int
 
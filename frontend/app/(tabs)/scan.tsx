@@ -23,9 +23,6 @@ import {
   websocketService,
   WebSocketMessage,
   SessionStateMessage,
-  ItemAssignedMessage,
-  AssignmentUpdatedMessage,
-  AssignmentRemovedMessage,
   SelectableParticipantsMessage,
   PayingForParticipantsMessage,
   SummaryUpdatedMessage,
@@ -160,57 +157,30 @@ export default function ScanScreen() {
         console.error('[WebSocket] Error message received:', message.message);
         setError(message.message);
         // Don't set wsConnected to false on error - connection might still be open
-      } else if (message.type === 'item_assigned') {
-        // Update session data with new assignment
+      } else if (message.type === 'assignments_changed') {
+        // Apply a batch of assignment writes: additions first, then rebalanced amounts, then removals
         setSessionData((prev) => {
           if (!prev) {
-            console.warn('[WebSocket] item_assigned: no previous session data');
+            console.warn('[WebSocket] assignments_changed: no previous session data');
             return prev;
           }
-          // Check if assignment already exists to prevent duplicates
-          const exists = prev.assignments.some((a) => a.id === message.assignment_id);
-          if (exists) {
-            return prev;
-          }
-          
-          const newAssignments = [...prev.assignments, {
-            id: message.assignment_id,
-            order_item_id: message.order_item_id,
-            creditor_id: message.creditor_id,
-            debtor_id: message.debtor_id,
-            assigned_amount: message.assigned_amount,
-          }];
-          return {
-            ...prev,
-            assignments: newAssignments,
-          };
-        });
-      } else if (message.type === 'assignment_updated') {
-        // Update existing assignment
-        setSessionData((prev) => {
-          if (!prev) return prev;
-          return {
-            ...prev,
-            assignments: prev.assignments.map((a) =>
-              a.id === message.assignment_id
-                ? { ...a, assigned_amount: message.assigned_amount }
+          const existingIds = new Set(prev.assignments.map((a) => a.id));
+          let assignments = [
+            ...prev.assignments,
+            ...message.added.filter((a) => !existingIds.has(a.id)),
+          ];
+          message.updated.forEach((update) => {
+            const updatedIds = new Set(update.assignment_ids);
+            assignments = assignments.map((a) =>
+              updatedIds.has(a.id)
+                ? { ...a, assigned_amount: update.assigned_amount }
                 : a
-            ),
-          };
-        });
-      } else if (message.type === 'assignment_removed') {
-        // Remove assignment
-        // Note: We don't update payingForParticipants here because changes are only applied when "Accept" is pressed
-        setSessionData((prev) => {
-          if (!prev) {
-            console.warn('[WebSocket] assignment_removed: no previous session data');
-            return prev;
-          }
-          const beforeCount = prev.assignments.length;
-          const filtered = prev.assignments.filter((a) => a.id !== message.assignment_id);
+            );
+          });
+          const removedIds = new Set(message.removed);
           return {
             ...prev,
-            assignments: filtered,
+            assignments: assignments.filter((a) => !removedIds.has(a.id)),
           };
         });
       } else if (message.type === 'participant_joined') {
@@ -278,6 +248,10 @@ export default function ScanScreen() {
           } else if (message.type === 'session_unlocked') {
             setSessionLocked(false);
             setLockedByUserId(null);
+          } else if (message.type === 'session_synced') {
+            // State is unchanged since our last session_state; only refresh the lock status
+            setSessionLocked(message.locked);
+            setLockedByUserId(message.locked_by_user_id);
           }
     });
 
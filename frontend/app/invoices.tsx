@@ -50,8 +50,7 @@ export default function InvoicesScreen() {
       if (filter === 'pending') {
         invoicesData = await apiService.getUserPendingInvoices(user.id);
       } else if (filter === 'paid') {
-        invoicesData = await apiService.getUserInvoices(user.id);
-        invoicesData = invoicesData.filter((inv: any) => inv.status === 'paid');
+        invoicesData = await apiService.getUserInvoices(user.id, 'paid');
       } else {
         invoicesData = await apiService.getUserInvoices(user.id);
       }
@@ -1,6 +1,9 @@
 // API Configuration
 export const API_BASE_URL = process.env.EXPO_PUBLIC_API_URL || 'http://56.126.24.163';
 
+// Invoice list endpoints return pages of at most this many invoices (the backend's MAX_PAGE_SIZE)
+const INVOICE_PAGE_SIZE = 200;
+
 export interface RegisterRequest {
   email: string;
   password: string;
@@ -269,27 +272,38 @@ class ApiService {
   }
 
   // Invoices
+  // Follow the cursor through every page of an invoice list endpoint
+  private async requestAllInvoicePages(endpoint: string, params = new URLSearchParams()): Promise<any[]> {
+    const invoices: any[] = [];
+    params.set('limit', String(INVOICE_PAGE_SIZE));
+    while (true) {
+      const page = await this.request<any[]>(`${endpoint}?${params.toString()}`, {
+        method: 'GET',
+      });
+      invoices.push(...page);
+      if (page.length < INVOICE_PAGE_SIZE) {
+        return invoices;
+      }
+      params.set('cursor', page[page.length - 1].id);
+    }
+  }
+
   async getInvoices(userId?: string, status?: string, groupId?: string): Promise<any[]> {
     const params = new URLSearchParams();
     if (userId) params.append('user_id', userId);
     if (status) params.append('status', status);
     if (groupId) params.append('group_id', groupId);
-    const query = params.toString() ? `?${params.toString()}` : '';
-    return this.request(`/api/invoices${query}`, {
-      method: 'GET',
-    });
+    return this.requestAllInvoicePages('/api/invoices', params);
   }
 
-  async getUserInvoices(userId: string): Promise<any[]> {
-    return this.request(`/api/invoices/users/${userId}/invoices`, {
-      method: 'GET',
-    });
+  async getUserInvoices(userId: string, status?: string): Promise<any[]> {
+    const params = new URLSearchParams();
+    if (status) params.append('status', status);
+    return this.requestAllInvoicePages(`/api/invoices/users/${userId}/invoices`, params);
   }
 
   async getUserPendingInvoices(userId: string): Promise<any[]> {
-    return this.request(`/api/invoices/users/${userId}/invoices/pending`, {
-      method: 'GET',
-    });
+    return this.requestAllInvoicePages(`/api/invoices/users/${userId}/invoices/pending`);
   }
 
   async getInvoice(invoiceId: string): Promise<any> {
@@ -18,6 +18,7 @@ export interface SessionStateMessage {
     currency: string;
     locked?: boolean;
     locked_by_user_id?: string | null;
+    version?: number;
   };
   participants: Array<{
     id: string;
@@ -48,6 +49,7 @@ export interface ParticipantJoinedMessage {
   joined_at: string;
   user_name?: string | null;
   user_avatar_url?: string | null;
+  version: number;
 }
 
 export interface ParticipantLeftMessage {
@@ -55,24 +57,22 @@ export interface ParticipantLeftMessage {
   participant_id: string;
 }
 
-export interface ItemAssignedMessage {
-  type: 'item_assigned';
-  assignment_id: string;
-  order_item_id: string;
-  creditor_id: string;
-  debtor_id: string | null;
-  assigned_amount: number;
-}
-
-export interface AssignmentUpdatedMessage {
-  type: 'assignment_updated';
-  assignment_id: string;
-  assigned_amount: number;
-}
-
-export interface AssignmentRemovedMessage {
-  type: 'assignment_removed';
-  assignment_id: string;
+export interface AssignmentsChangedMessage {
+  type: 'assignments_changed';
+  added: Array<{
+    id: string;
+    order_item_id: string;
+    creditor_id: string;
+    debtor_id: string | null;
+    assigned_amount: number;
+  }>;
+  updated: Array<{
+    order_item_id: string;
+    assigned_amount: number;
+    assignment_ids: string[];
+  }>;
+  removed: string[];
+  version: number;
 }
 
 export interface SummaryUpdatedMessage {
@@ -108,24 +108,32 @@ export interface SessionFinalizedMessage {
   session_id: string;
   total_amount: number;
   ready_for_invoices: boolean;
+  version: number;
 }
 
 export interface SessionLockedMessage {
   type: 'session_locked';
   locked_by_user_id: string;
+  version: number;
 }
 
 export interface SessionUnlockedMessage {
   type: 'session_unlocked';
+  version: number;
+}
+
+export interface SessionSyncedMessage {
+  type: 'session_synced';
+  version: number;
+  locked: boolean;
+  locked_by_user_id: string | null;
 }
 
 export type WebSocketMessage =
   | SessionStateMessage
   | ParticipantJoinedMessage
   | ParticipantLeftMessage
-  | ItemAssignedMessage
-  | AssignmentUpdatedMessage
-  | AssignmentRemovedMessage
+  | AssignmentsChangedMessage
   | SummaryUpdatedMessage
   | ErrorMessage
   | SelectableParticipantsMessage
@@ -133,11 +141,13 @@ export type WebSocketMessage =
   | AssignmentsValidatedMessage
   | SessionFinalizedMessage
   | SessionLockedMessage
-  | SessionUnlockedMessage;
+  | SessionUnlockedMessage
+  | SessionSyncedMessage;
 
 export interface JoinSessionMessage {
   type: 'join_session';
   user_id: string;
+  last_version?: number | null;
 }
 
 export interface AssignItemMessage {
@@ -211,6 +221,7 @@ export class WebSocketService {
   private connectionResolve: (() => void) | null = null;
   private connectionReject: ((error: Error) => void) | null = null;
   private wasConnected: boolean = false; // Track if connection was ever established
+  private lastVersion: { sessionId: string; version: number } | null = null; // Last session state version seen
   private listeners: Set<(message: WebSocketMessage) => void> = new Set();
   private onConnectCallbacks: Set<() => void> = new Set();
   private onDisconnectCallbacks: Set<() => void> = new Set();
@@ -240,15 +251,21 @@ export class WebSocketService {
         return;
       }
 
-      this.disconnect();
+      // Keep the last seen version: a reconnect to the same session can skip the full state
+      this.disconnect(true);
 
       const url = getWebSocketUrl(`/api/ws/table_sessions/${sessionId}`);
       const token = getAuthToken();
+      const lastVersion = this.lastVersion?.sessionId === sessionId ? this.lastVersion.version : null;
       
       // For WebSocket, we can't set headers directly in React Native
       // The backend should handle auth via query params or accept without auth for now
       // If auth is required, we might need to pass token as query param
-      const wsUrl = token ? `${url}?token=${token}` : url;
+      const params = new URLSearchParams();
+      if (token) params.append('token', token);
+      // The backend answers session_synced instead of the full state if nothing changed since this version
+      if (lastVersion !== null) params.append('last_version', String(lastVersion));
+      const wsUrl = params.toString() ? `${url}?${params.toString()}` : url;
 
       // Set up connection timeout
       this.connectionTimeoutId = setTimeout(() => {
@@ -276,6 +293,8 @@ export class WebSocketService {
             const joinMessage: JoinSessionMessage = {
               type: 'join_session',
               user_id: userId,
+              // Lets the backend skip resending the full state if nothing changed since we last had it
+              last_version: lastVersion,
             };
             this.send(joinMessage);
           }
@@ -287,6 +306,7 @@ export class WebSocketService {
         this.ws.onmessage = (event) => {
           try {
             const message: WebSocketMessage = JSON.parse(event.data);
+            this.trackVersion(sessionId, message);
             this.listeners.forEach((listener) => listener(message));
           } catch (error) {
             console.error('Error parsing WebSocket message:', error);
@@ -362,7 +382,27 @@ export class WebSocketService {
     this.connectionTimeout = timeout;
   }
 
-  disconnect() {
+  // Record the session version a message brings us to. A change broadcast only counts if it is the next
+  // version; after a gap (e.g. a version bump nobody broadcast) the version stays behind, so a rejoin resyncs
+  private trackVersion(sessionId: string, message: WebSocketMessage) {
+    if (message.type === 'session_state') {
+      if (message.session.version !== undefined) {
+        this.lastVersion = { sessionId, version: message.session.version };
+      }
+    } else if (message.type === 'session_synced') {
+      this.lastVersion = { sessionId, version: message.version };
+    } else if ('version' in message && this.lastVersion?.sessionId === sessionId) {
+      if (message.version === this.lastVersion.version + 1) {
+        this.lastVersion = { sessionId, version: message.version };
+      }
+    }
+  }
+
+  // keepSyncState is for reconnects; a screen that disconnects drops its state, so the next connect needs it in full
+  disconnect(keepSyncState: boolean = false) {
+    if (!keepSyncState) {
+      this.lastVersion = null;
+    }
     this.cancelConnection();
     if (this.ws) {
       this.ws.close(1000, 'Client disconnect');